@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+NCBI genetic code tables, compiled once into 64-entry lookup arrays.
+
+Codons are indexed in the NCBI order (T/U, C, A, G for each position), so
+index = 16 * first + 4 * second + third. Every table is a tuple of
+three-letter amino acid names ('STOP' for stop codons), which lets a
+codon be translated with a single index instead of a dictionary built
+per call. Switching table is just picking another tuple.
+"""
+
+# --- 1. Raw NCBI tables (one letter per codon, TCAG order) ---
+# Source: NCBI "The Genetic Codes" (gc.prt). Tables with ambiguous
+# stop/sense codons (27, 28, 31, 32) are left out on purpose.
+NCBI_TABLES = {
+    1: ("Standard",
+        "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    2: ("Vertebrate Mitochondrial",
+        "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSS**VVVVAAAADDEEGGGG"),
+    3: ("Yeast Mitochondrial",
+        "FFLLSSSSYY**CCWWTTTTPPPPHHQQRRRRIIMMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    4: ("Mold, Protozoan, Coelenterate Mitochondrial and Mycoplasma",
+        "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    5: ("Invertebrate Mitochondrial",
+        "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSSSVVVVAAAADDEEGGGG"),
+    6: ("Ciliate, Dasycladacean and Hexamita Nuclear",
+        "FFLLSSSSYYQQCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    9: ("Echinoderm and Flatworm Mitochondrial",
+        "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG"),
+    10: ("Euplotid Nuclear",
+         "FFLLSSSSYY**CCCWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    11: ("Bacterial, Archaeal and Plant Plastid",
+         "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    12: ("Alternative Yeast Nuclear",
+         "FFLLSSSSYY**CC*WLLLSPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    13: ("Ascidian Mitochondrial",
+         "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNKKSSGGVVVVAAAADDEEGGGG"),
+    14: ("Alternative Flatworm Mitochondrial",
+         "FFLLSSSSYYY*CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNNKSSSSVVVVAAAADDEEGGGG"),
+    16: ("Chlorophycean Mitochondrial",
+         "FFLLSSSSYY*LCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    21: ("Trematode Mitochondrial",
+         "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIMMTTTTNNNKSSSSVVVVAAAADDEEGGGG"),
+    22: ("Scenedesmus obliquus Mitochondrial",
+         "FFLLSS*SYY*LCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    23: ("Thraustochytrium Mitochondrial",
+         "FF*LSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    24: ("Rhabdopleuridae Mitochondrial",
+         "FFLLSSSSYY**CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSSKVVVVAAAADDEEGGGG"),
+    25: ("Candidate Division SR1 and Gracilibacteria",
+         "FFLLSSSSYY**CCGWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    26: ("Pachysolen tannophilus Nuclear",
+         "FFLLSSSSYY**CC*WLLLAPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    29: ("Mesodinium Nuclear",
+         "FFLLSSSSYYYYCC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    30: ("Peritrich Nuclear",
+         "FFLLSSSSYYEECC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"),
+    33: ("Cephalodiscidae Mitochondrial",
+         "FFLLSSSSYYY*CCWWLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSSKVVVVAAAADDEEGGGG"),
+}
+
+STANDARD_TABLE_ID = 1
+
+# One-letter -> three-letter amino acid names used by the lab scripts
+THREE_LETTER = {
+    'A': 'Ala', 'R': 'Arg', 'N': 'Asn', 'D': 'Asp', 'C': 'Cys',
+    'Q': 'Gln', 'E': 'Glu', 'G': 'Gly', 'H': 'His', 'I': 'Ile',
+    'L': 'Leu', 'K': 'Lys', 'M': 'Met', 'F': 'Phe', 'P': 'Pro',
+    'S': 'Ser', 'T': 'Thr', 'W': 'Trp', 'Y': 'Tyr', 'V': 'Val',
+    '*': 'STOP'
+}
+
+# --- 2. Codon -> index lookup (built once, RNA and DNA spellings) ---
+BASES = "UCAG"
+
+CODONS = tuple(a + b + c for a in BASES for b in BASES for c in BASES)
+
+CODON_INDEX = {}
+for _index, _codon in enumerate(CODONS):
+    CODON_INDEX[_codon] = _index
+    CODON_INDEX[_codon.replace('U', 'T')] = _index
+
+
+def compile_table(table_string):
+    """
+    Turns a 64-character NCBI table string into a tuple of three-letter
+    amino acid names ('STOP' for stop codons).
+    """
+    if len(table_string) != 64:
+        raise ValueError("An NCBI translation table must have 64 entries.")
+    return tuple(THREE_LETTER[aa] for aa in table_string)
+
+
+# --- 3. Precompiled tables ---
+COMPILED_TABLES = {
+    table_id: compile_table(table_string)
+    for table_id, (_, table_string) in NCBI_TABLES.items()
+}
+
+
+def get_genetic_code(table_id=STANDARD_TABLE_ID):
+    """
+    Returns the precompiled 64-entry table for an NCBI table id.
+    """
+    try:
+        return COMPILED_TABLES[table_id]
+    except KeyError:
+        known = ", ".join(str(t) for t in sorted(COMPILED_TABLES))
+        raise ValueError(f"Unknown genetic code table {table_id}. Known tables: {known}")
+
+
+def get_table_name(table_id=STANDARD_TABLE_ID):
+    """Returns the NCBI name of a translation table."""
+    get_genetic_code(table_id)
+    return NCBI_TABLES[table_id][0]
+
+
+def codon_to_amino_acid(codon, table=None):
+    """
+    Translates one codon with a precompiled table.
+    Returns 'X' for codons that contain unknown bases (e.g. 'N').
+    """
+    if table is None:
+        table = COMPILED_TABLES[STANDARD_TABLE_ID]
+    index = CODON_INDEX.get(codon, -1)
+    if index == -1:
+        return 'X'
+    return table[index]
+
+
+def table_as_dict(table_id=STANDARD_TABLE_ID):
+    """
+    Returns a table as the classic {RNA codon: amino acid} dictionary.
+    """
+    table = get_genetic_code(table_id)
+    return {codon: table[i] for i, codon in enumerate(CODONS)}
+
+
+# The standard code in the dictionary form the lab scripts started with
+GENETIC_CODE = table_as_dict(STANDARD_TABLE_ID)
+
+
+# --- 4. One-letter tables for protein FASTA output ---
+# {codon: one-letter amino acid} for RNA and DNA spellings, '*' = stop
+ONE_LETTER_TABLES = {
+    table_id: {codon: table_string[index] for codon, index in CODON_INDEX.items()}
+    for table_id, (_, table_string) in NCBI_TABLES.items()
+}
+
+
+def get_one_letter_code(table_id=STANDARD_TABLE_ID):
+    """
+    Returns the precompiled {codon: one-letter amino acid} mapping of an
+    NCBI table. Stop codons map to '*'.
+    """
+    get_genetic_code(table_id)
+    return ONE_LETTER_TABLES[table_id]
@@ -5,31 +5,12 @@ Created on Thu Oct 23 14:08:05 2025
 @author: Antonio
 """
 
-# 1. The Genetic Code Table (from your image)
-# This dictionary maps each 3-letter RNA codon to its corresponding amino acid
-# or a "STOP" signal.
-GENETIC_CODE = {
-    # U-block
-    'UUU': 'Phe', 'UUC': 'Phe', 'UUA': 'Leu', 'UUG': 'Leu',
-    'UCU': 'Ser', 'UCC': 'Ser', 'UCA': 'Ser', 'UCG': 'Ser',
-    'UAU': 'Tyr', 'UAC': 'Tyr', 'UAA': 'STOP', 'UAG': 'STOP',
-    'UGU': 'Cys', 'UGC': 'Cys', 'UGA': 'STOP', 'UGG': 'Trp',
-    # C-block
-    'CUU': 'Leu', 'CUC': 'Leu', 'CUA': 'Leu', 'CUG': 'Leu',
-    'CCU': 'Pro', 'CCC': 'Pro', 'CCA': 'Pro', 'CCG': 'Pro',
-    'CAU': 'His', 'CAC': 'His', 'CAA': 'Gln', 'CAG': 'Gln',
-    'CGU': 'Arg', 'CGC': 'Arg', 'CGA': 'Arg', 'CGG': 'Arg',
-    # A-block
-    'AUU': 'Ile', 'AUC': 'Ile', 'AUA': 'Ile', 'AUG': 'Met',
-    'ACU': 'Thr', 'ACC': 'Thr', 'ACA': 'Thr', 'ACG': 'Thr',
-    'AAU': 'Asn', 'AAC': 'Asn', 'AAA': 'Lys', 'AAG': 'Lys',
-    'AGU': 'Ser', 'AGC': 'Ser', 'AGA': 'Arg', 'AGG': 'Arg',
-    # G-block
-    'GUU': 'Val', 'GUC': 'Val', 'GUA': 'Val', 'GUG': 'Val',
-    'GCU': 'Ala', 'GCC': 'Ala', 'GCA': 'Ala', 'GCG': 'Ala',
-    'GAU': 'Asp', 'GAC': 'Asp', 'GAA': 'Glu', 'GAG': 'Glu',
-    'GGU': 'Gly', 'GGC': 'Gly', 'GGA': 'Gly', 'GGG': 'Gly'
-}
+# 1. The Genetic Code Tables
+# The NCBI translation tables live in genetic_codes.py, precompiled into
+# 64-entry arrays indexed by codon. The standard code is table 1.
+import sys
+from genetic_codes import (STANDARD_TABLE_ID, codon_to_amino_acid, get_genetic_code,
+                           get_one_letter_code)
 
 # 2. Transcription Function (DNA -> RNA)
 def transcribe(dna_sequence):
@@ -41,12 +22,15 @@ def transcribe(dna_sequence):
     return dna_sequence.upper().replace('T', 'U')
 
 # 3. Translation Function (RNA -> Amino Acid Sequence)
-def translate(rna_sequence):
+def translate(rna_sequence, table_id=STANDARD_TABLE_ID):
     """
     Converts an mRNA sequence into an amino acid (protein) sequence.
     Translation starts at the first 'AUG' (Met) codon and stops
     when a 'STOP' codon is encountered.
+    table_id selects the NCBI genetic code (1 = standard,
+    2 = vertebrate mitochondrial, 11 = bacterial/plastid, ...).
     """
+    genetic_code = get_genetic_code(table_id)
     protein = []
     is_translating = False
 
@@ -67,9 +51,9 @@ def translate(rna_sequence):
         if len(codon) < 3:
             break  # Reached the end of the sequence
 
-        # Look up the codon in the genetic code table
-        # .get(codon, 'X') returns 'X' (unknown) if the codon is not found
-        amino_acid = GENETIC_CODE.get(codon, 'X')
+        # Look up the codon in the precompiled genetic code table
+        # Codons with unknown bases (e.g. 'N') come back as 'X'
+        amino_acid = codon_to_amino_acid(codon, genetic_code)
 
         # Check for stop codon
         if amino_acid == 'STOP':
@@ -81,8 +65,133 @@ def translate(rna_sequence):
     # Join the list of amino acids into a single string, separated by dashes
     return "-".join(protein)
 
+# 4. Batch Translation (FASTA -> protein FASTA)
+COMPLEMENT = str.maketrans("ACGTUNacgtun", "TGCAANtgcaan")
+
+def read_fasta_records(filename):
+    """
+    Yields (header, sequence) pairs from a FASTA file one record at a time,
+    so only the record being translated is held in memory.
+    """
+    header = None
+    lines = []
+    with open(filename, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith('>'):
+                if header is not None:
+                    yield header, "".join(lines).upper()
+                header = line[1:]
+                lines = []
+            else:
+                lines.append(line)
+    if header is not None:
+        yield header, "".join(lines).upper()
+
+def reverse_complement(dna_sequence):
+    """Returns the reverse complement of a DNA sequence."""
+    return dna_sequence.translate(COMPLEMENT)[::-1]
+
+def translate_frame(dna_sequence, frame, one_letter_code):
+    """
+    Translates a whole reading frame (0, 1 or 2) into one-letter amino
+    acids. Stops are kept as '*', codons with unknown bases become 'X'.
+    """
+    get = one_letter_code.get
+    return "".join([get(dna_sequence[i:i+3], 'X')
+                    for i in range(frame, len(dna_sequence) - 2, 3)])
+
+def find_orfs(dna_sequence, one_letter_code, min_protein_length=30):
+    """
+    Yields (strand, frame, start, end, protein) for every open reading
+    frame (first ATG up to the stop codon) on both strands.
+    start/end are 0-based forward-strand coordinates, end exclusive.
+    """
+    seq_len = len(dna_sequence)
+    for strand, strand_seq in (('+', dna_sequence), ('-', reverse_complement(dna_sequence))):
+        for frame in range(3):
+            frame_protein = translate_frame(strand_seq, frame, one_letter_code)
+            offset = 0
+            for segment in frame_protein.split('*'):
+                met = segment.find('M')
+                has_stop = offset + len(segment) < len(frame_protein)
+                if met != -1 and len(segment) - met >= min_protein_length:
+                    start = frame + 3 * (offset + met)
+                    end = frame + 3 * (offset + len(segment) + (1 if has_stop else 0))
+                    if strand == '-':
+                        start, end = seq_len - end, seq_len - start
+                    yield strand, frame + 1, start, end, segment[met:]
+                offset += len(segment) + 1
+
+def _wrap(sequence, width=60):
+    """Splits a sequence into FASTA lines of the given width."""
+    return "\n".join(sequence[i:i+width] for i in range(0, len(sequence), width))
+
+def write_protein_fasta(input_fasta, output_fasta, mode="orf", table_id=STANDARD_TABLE_ID,
+                        min_protein_length=30, buffer_size=1 << 20):
+    """
+    Translates every record of input_fasta and streams the proteins to
+    output_fasta as one-letter protein FASTA.
+    mode="orf"   -> one record per open reading frame (both strands)
+    mode="frame" -> one record per reading frame (+1..+3, -1..-3)
+    Output is collected in a buffer and written in chunks of about
+    buffer_size characters, so no more than one chunk of proteins is
+    ever held in memory.
+    Returns the number of protein records written.
+    """
+    if mode not in ("orf", "frame"):
+        raise ValueError("mode must be 'orf' or 'frame'")
+    one_letter_code = get_one_letter_code(table_id)
+
+    buffer = []
+    buffered = 0
+    written = 0
+    with open(output_fasta, 'w') as out:
+        for header, dna_sequence in read_fasta_records(input_fasta):
+            record_id = header.split()[0] if header.strip() else "sequence"
+
+            if mode == "orf":
+                records = (
+                    (f"{record_id}_orf{n} strand={strand} frame={frame} "
+                     f"start={start + 1} end={end} length={len(protein)}", protein)
+                    for n, (strand, frame, start, end, protein)
+                    in enumerate(find_orfs(dna_sequence, one_letter_code, min_protein_length), 1)
+                )
+            else:
+                records = (
+                    (f"{record_id}_frame{strand}{frame + 1}",
+                     translate_frame(strand_seq, frame, one_letter_code))
+                    for strand, strand_seq in (('+', dna_sequence),
+                                               ('-', reverse_complement(dna_sequence)))
+                    for frame in range(3)
+                )
+
+            for name, protein in records:
+                entry = f">{name}\n{_wrap(protein)}\n"
+                buffer.append(entry)
+                buffered += len(entry)
+                written += 1
+                if buffered >= buffer_size:
+                    out.write("".join(buffer))
+                    buffer = []
+                    buffered = 0
+
+        out.write("".join(buffer))
+
+    return written
+
 # --- Main Application ---
-if __name__ == "__main__":
+if __name__ == "__main__" and len(sys.argv) >= 3:
+    # Batch mode: python lab4_1.py input.fasta output.faa [orf|frame] [table_id]
+    input_fasta, output_fasta = sys.argv[1], sys.argv[2]
+    mode = sys.argv[3] if len(sys.argv) > 3 else "orf"
+    table_id = int(sys.argv[4]) if len(sys.argv) > 4 else STANDARD_TABLE_ID
+    count = write_protein_fasta(input_fasta, output_fasta, mode, table_id)
+    print(f"Wrote {count} protein records to {output_fasta}")
+
+elif __name__ == "__main__":
     # Example DNA coding sequence (from ATG to TAA)
     # This is a simplified gene sequence for demonstration
     dna_coding_strand = "GGCATGTACCCGGATTGTCGTCAAGCCGCTAGCATAA"
@@ -1,32 +1,17 @@
 import sys
 import os
+import hashlib
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import matplotlib.pyplot as plt
 # Note: urllib and json imports have been removed.
 
-# 1. The Genetic Code Table (from your image)
-GENETIC_CODE = {
-    # U-block
-    'UUU': 'Phe', 'UUC': 'Phe', 'UUA': 'Leu', 'UUG': 'Leu',
-    'UCU': 'Ser', 'UCC': 'Ser', 'UCA': 'Ser', 'UCG': 'Ser',
-    'UAU': 'Tyr', 'UAC': 'Tyr', 'UAA': 'STOP', 'UAG': 'STOP',
-    'UGU': 'Cys', 'UGC': 'Cys', 'UGA': 'STOP', 'UGG': 'Trp',
-    # C-block
-    'CUU': 'Leu', 'CUC': 'Leu', 'CUA': 'Leu', 'CUG': 'Leu',
-    'CCU': 'Pro', 'CCC': 'Pro', 'CCA': 'Pro', 'CCG': 'Pro',
-    'CAU': 'His', 'CAC': 'His', 'CAA': 'Gln', 'CAG': 'Gln',
-    'CGU': 'Arg', 'CGC': 'Arg', 'CGA': 'Arg', 'CGG': 'Arg',
-    # A-block
-    'AUU': 'Ile', 'AUC': 'Ile', 'AUA': 'Ile', 'AUG': 'Met',
-    'ACU': 'Thr', 'ACC': 'Thr', 'ACA': 'Thr', 'ACG': 'Thr',
-    'AAU': 'Asn', 'AAC': 'Asn', 'AAA': 'Lys', 'AAG': 'Lys',
-    'AGU': 'Ser', 'AGC': 'Ser', 'AGA': 'Arg', 'AGG': 'Arg',
-    # G-block
-    'GUU': 'Val', 'GUC': 'Val', 'GUA': 'Val', 'GUG': 'Val',
-    'GCU': 'Ala', 'GCC': 'Ala', 'GCA': 'Ala', 'GCG': 'Ala',
-    'GAU': 'Asp', 'GAC': 'Asp', 'GAA': 'Glu', 'GAG': 'Glu',
-    'GGU': 'Gly', 'GGC': 'Gly', 'GGA': 'Gly', 'GGG': 'Gly'
-}
+from genetic_codes import CODONS, CODON_INDEX, STANDARD_TABLE_ID, get_genetic_code, get_table_name
+
+# 1. The Genetic Code Tables
+# All NCBI translation tables are precompiled in genetic_codes.py as
+# 64-entry arrays indexed by codon; pick one per genome with its table id.
 
 # 2. Pre-loaded Food Information Database
 AMINO_ACID_INFO = {
@@ -84,29 +69,154 @@ def parse_fasta(filename):
             
     return "".join(sequence).upper()
 
-def transcribe(dna_sequence):
+def get_amino_acid_frequencies(codon_counts, genetic_code=None):
     """
-    Converts a DNA coding strand sequence into an mRNA sequence.
+    Calculates the total frequency of each amino acid based on codon counts.
+    genetic_code is a precompiled 64-entry table from genetic_codes.py
+    (the standard code if omitted).
     """
-    return dna_sequence.replace('T', 'U')
+    if genetic_code is None:
+        genetic_code = get_genetic_code(STANDARD_TABLE_ID)
+
+    amino_acid_counts = Counter()
+    for codon, count in codon_counts.items():
+        codon_idx = CODON_INDEX.get(codon, -1)
+        if codon_idx == -1:
+            continue  # Partial codon or unknown base
+        amino_acid = genetic_code[codon_idx]
+        if amino_acid != 'STOP':
+            amino_acid_counts[amino_acid] += count
+    return amino_acid_counts
+
+# --- Vectorized codon counting (used by the N-genome comparison) ---
+
+# Byte -> base code lookup (T/U=0, C=1, A=2, G=3, anything else=4),
+# matching the codon order of genetic_codes.CODONS
+_BASE_CODES = np.full(256, 4, dtype=np.uint8)
+for _base, _code in (('T', 0), ('U', 0), ('C', 1), ('A', 2), ('G', 3)):
+    _BASE_CODES[ord(_base)] = _code
+    _BASE_CODES[ord(_base.lower())] = _code
+
+CODON_CACHE_DIR = "codon_cache"
 
-def get_codon_frequencies(rna_sequence):
+def get_codon_count_vector(sequence):
     """
-    Counts the frequency of each 3-letter codon in an RNA sequence.
+    Counts the codons of a DNA or RNA sequence (reading frame 1) into a
+    64-entry vector indexed like genetic_codes.CODONS.
+    Codons that contain unknown bases are skipped.
     """
-    codons = [rna_sequence[i:i+3] for i in range(0, len(rna_sequence) - 2, 3)]
-    return Counter(codons)
+    codes = _BASE_CODES[np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)]
+    num_codons = len(codes) // 3
+    triplets = codes[:num_codons * 3].reshape(num_codons, 3).astype(np.int64)
+    valid = (triplets < 4).all(axis=1)
+    indices = triplets[valid, 0] * 16 + triplets[valid, 1] * 4 + triplets[valid, 2]
+    return np.bincount(indices, minlength=64)
 
-def get_amino_acid_frequencies(codon_counts, genetic_code):
+def codon_vector_to_counter(codon_vector):
     """
-    Calculates the total frequency of each amino acid based on codon counts.
+    Converts a 64-entry codon vector back into a Counter of RNA codons.
     """
-    amino_acid_counts = Counter()
-    for codon, count in codon_counts.items():
-        amino_acid = genetic_code.get(codon)
-        if amino_acid and amino_acid != 'STOP':
-            amino_acid_counts[amino_acid] += count
-    return amino_acid_counts
+    return Counter({codon: int(count) for codon, count in zip(CODONS, codon_vector) if count})
+
+def _cache_path(filename):
+    """
+    Returns the cache file for a FASTA file. The key covers the path,
+    size and modification time, so an edited file is counted again.
+    """
+    stat = os.stat(filename)
+    key = f"{os.path.abspath(filename)}|{stat.st_size}|{stat.st_mtime_ns}"
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    base = os.path.splitext(os.path.basename(filename))[0]
+    return os.path.join(CODON_CACHE_DIR, f"{base}.{digest}.npy")
+
+def load_codon_counts(filename, use_cache=True):
+    """
+    Returns the codon count vector of a FASTA file, reading it from the
+    on-disk cache when the file has been counted before.
+    """
+    cache_file = _cache_path(filename)
+    if use_cache and os.path.exists(cache_file):
+        return np.load(cache_file)
+
+    codon_vector = get_codon_count_vector(parse_fasta(filename))
+
+    if use_cache:
+        os.makedirs(CODON_CACHE_DIR, exist_ok=True)
+        np.save(cache_file, codon_vector)
+    return codon_vector
+
+def compute_codon_matrix(filenames, max_workers=None, use_cache=True):
+    """
+    Builds the (genomes x 64) codon count matrix, counting the genomes
+    in parallel worker processes.
+    """
+    if len(filenames) == 1:
+        return load_codon_counts(filenames[0], use_cache)[np.newaxis, :]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        vectors = list(executor.map(load_codon_counts, filenames,
+                                    [use_cache] * len(filenames)))
+    return np.vstack(vectors)
+
+def compute_amino_acid_matrix(codon_matrix, table_ids):
+    """
+    Folds the codon matrix into an amino acid frequency matrix (each row
+    sums to 1), translating every genome with its own genetic code.
+    Returns (amino_acid_names, matrix).
+    """
+    tables = [get_genetic_code(table_id) for table_id in table_ids]
+    amino_acids = sorted({aa for table in tables for aa in table if aa != 'STOP'})
+    aa_index = {aa: i for i, aa in enumerate(amino_acids)}
+
+    aa_matrix = np.zeros((codon_matrix.shape[0], len(amino_acids)))
+    for row, table in enumerate(tables):
+        sense = np.array([aa != 'STOP' for aa in table])
+        targets = np.array([aa_index.get(aa, 0) for aa in table])
+        aa_matrix[row] = np.bincount(targets[sense], weights=codon_matrix[row][sense],
+                                     minlength=len(amino_acids))
+
+    totals = aa_matrix.sum(axis=1, keepdims=True)
+    totals[totals == 0] = 1
+    return amino_acids, aa_matrix / totals
+
+def pairwise_codon_distances(codon_matrix):
+    """
+    Returns the (genomes x genomes) codon-usage distance matrix: the total
+    variation distance between the relative codon frequencies, from
+    0 (identical usage) to 1 (no codon in common).
+    """
+    totals = codon_matrix.sum(axis=1, keepdims=True).astype(float)
+    totals[totals == 0] = 1
+    frequencies = codon_matrix / totals
+    return 0.5 * np.abs(frequencies[:, np.newaxis, :] - frequencies[np.newaxis, :, :]).sum(axis=2)
+
+def shared_and_unique_top_codons(codon_matrix, top_n=10):
+    """
+    Finds the codons in the top N of every genome, and for each genome the
+    top N codons that no other genome has in its top N.
+    Returns (shared_codon_indices, [unique_codon_indices per genome]).
+    """
+    # Stable sort keeps the codon order for ties
+    top = np.argsort(-codon_matrix, axis=1, kind='stable')[:, :top_n]
+    in_top = np.zeros(codon_matrix.shape, dtype=bool)
+    np.put_along_axis(in_top, top, True, axis=1)
+
+    top_count = in_top.sum(axis=0)
+    shared = np.flatnonzero(top_count == codon_matrix.shape[0])
+    unique = [np.flatnonzero(in_top[row] & (top_count == 1)) for row in range(codon_matrix.shape[0])]
+    return shared, unique
+
+def parse_genome_argument(argument):
+    """
+    Parses a 'file.fasta' or 'file.fasta:TABLE_ID' command-line argument
+    into (label, filename, table_id).
+    """
+    filename, table_id = argument, STANDARD_TABLE_ID
+    head, sep, tail = argument.rpartition(':')
+    if sep and tail.isdigit():
+        filename, table_id = head, int(tail)
+    label = os.path.splitext(os.path.basename(filename))[0]
+    return label, filename, table_id
 
 def plot_top_codons(codon_counts, title, top_n=10):
     """
@@ -140,7 +250,7 @@ def find_and_print_food_recommendations(amino_acid_set):
     print("="*50)
     
     amino_acid_list_str = ", ".join(sorted(list(amino_acid_set)))
-    print(f"The top amino acids from both genomes are: {amino_acid_list_str}.")
+    print(f"The top amino acids from all genomes are: {amino_acid_list_str}.")
     print("Here is a breakdown of those amino acids and a general list of")
     print("foods that are low in protein (and thus low in these amino acids).\n")
     
@@ -166,56 +276,91 @@ def find_and_print_food_recommendations(amino_acid_set):
 def main():
     """
     Main function to run the complete analysis.
+    Genomes can be given on the command line as 'file.fasta' or
+    'file.fasta:TABLE_ID' (NCBI genetic code per genome), e.g.
+        python lab4_2.py covid.fasta influenza.fasta mito.fasta:2
+    Without arguments the COVID-19 vs Influenza comparison is run.
     """
-    COVID_FASTA = "covid.fasta"
-    INFLUENZA_FASTA = "influenza.fasta"
+    if len(sys.argv) > 1:
+        genomes = [parse_genome_argument(arg) for arg in sys.argv[1:]]
+    else:
+        genomes = [
+            ("COVID-19", "covid.fasta", STANDARD_TABLE_ID),
+            ("Influenza", "influenza.fasta", STANDARD_TABLE_ID),
+        ]
+
+    labels = [label for label, _, _ in genomes]
+    filenames = [filename for _, filename, _ in genomes]
+    table_ids = [table_id for _, _, table_id in genomes]
+
+    for filename in filenames:
+        if not os.path.exists(filename):
+            print(f"Error: File not found at '{filename}'", file=sys.stderr)
+            sys.exit(1)
+    for table_id in table_ids:
+        get_genetic_code(table_id)  # Fail early on an unknown table id
 
-    # --- COVID-19 Analysis ---
-    covid_dna = parse_fasta(COVID_FASTA)
-    covid_rna = transcribe(covid_dna)
-    covid_codon_counts = get_codon_frequencies(covid_rna)
-    covid_aa_counts = get_amino_acid_frequencies(covid_codon_counts, GENETIC_CODE)
-    plot_top_codons(covid_codon_counts, "Top 10 Most Frequent Codons: COVID-19")
+    # --- Codon count matrix (one row per genome, counted in parallel) ---
+    codon_matrix = compute_codon_matrix(filenames)
+    codon_counts = [codon_vector_to_counter(row) for row in codon_matrix]
+    aa_counts = [get_amino_acid_frequencies(counts, get_genetic_code(table_id))
+                 for counts, table_id in zip(codon_counts, table_ids)]
 
-    # --- Influenza Analysis ---
-    flu_dna = parse_fasta(INFLUENZA_FASTA)
-    flu_rna = transcribe(flu_dna)
-    flu_codon_counts = get_codon_frequencies(flu_rna)
-    flu_aa_counts = get_amino_acid_frequencies(flu_codon_counts, GENETIC_CODE)
-    plot_top_codons(flu_codon_counts, "Top 10 Most Frequent Codons: Influenza")
+    for label, counts in zip(labels, codon_counts):
+        if counts:
+            plot_top_codons(counts, f"Top 10 Most Frequent Codons: {label}")
 
     # --- Console Output ---
     print("\n" + "="*50)
     print("GENOME ANALYSIS CONSOLE OUTPUT")
     print("="*50)
 
-    # Find common codons
-    covid_top_10 = set([codon for codon, count in covid_codon_counts.most_common(10)])
-    flu_top_10 = set([codon for codon, count in flu_codon_counts.most_common(10)])
-    common_codons = covid_top_10.intersection(flu_top_10)
-    
-    print(f"\n--- Common Codons in Top 10 of Both Genomes ---")
-    if common_codons:
-        print(f"{'Codon':<6} | {'COVID-19 Count':<15} | {'Influenza Count':<15}")
-        print("-" * 40)
-        common_codon_stats = []
-        for codon in common_codons:
-            common_codon_stats.append((codon, covid_codon_counts[codon], flu_codon_counts[codon]))
-        common_codon_stats.sort(key=lambda x: x[1], reverse=True)
-        for codon, covid_count, flu_count in common_codon_stats:
-            print(f"{codon:<6} | {covid_count:<15} | {flu_count:<15}")
+    print("\n--- Genetic Code of Each Genome ---")
+    for label, table_id in zip(labels, table_ids):
+        print(f"{label}: table {table_id} ({get_table_name(table_id)})")
+
+    shared, unique = shared_and_unique_top_codons(codon_matrix, top_n=10)
+    column_width = max(15, max(len(label) for label in labels) + 6)
+
+    print(f"\n--- Common Codons in Top 10 of All {len(genomes)} Genomes ---")
+    if len(shared):
+        print(f"{'Codon':<6} | " + " | ".join(f"{label + ' Count':<{column_width}}" for label in labels))
+        print("-" * (9 + (column_width + 3) * len(labels)))
+        shared = sorted(shared, key=lambda idx: codon_matrix[0, idx], reverse=True)
+        for codon_idx in shared:
+            counts = " | ".join(f"{int(count):<{column_width}}" for count in codon_matrix[:, codon_idx])
+            print(f"{CODONS[codon_idx]:<6} | {counts}")
     else:
-        print("No codons were found in the top 10 of both genomes.")
+        print("No codons were found in the top 10 of all genomes.")
+
+    print(f"\n--- Top 10 Codons Unique to One Genome ---")
+    for label, codon_indices in zip(labels, unique):
+        codons = ", ".join(CODONS[idx] for idx in codon_indices) or "None"
+        print(f"{label}: {codons}")
+
+    print(f"\n--- Pairwise Codon-Usage Distance (0 = identical, 1 = disjoint) ---")
+    distances = pairwise_codon_distances(codon_matrix)
+    # At least 6 wide, so values like 0.123 or 12.34 keep a separating space
+    name_width = max(max(len(label) for label in labels) + 2, 6)
+    print(" " * name_width + "".join(f"{label:>{name_width}}" for label in labels))
+    for label, row in zip(labels, distances):
+        print(f"{label:<{name_width}}" + "".join(f"{value:>{name_width}.3f}" for value in row))
+
+    print(f"\n--- Amino Acid Frequency Matrix (%) ---")
+    amino_acids, aa_matrix = compute_amino_acid_matrix(codon_matrix, table_ids)
+    print(f"{'AA':<5}" + "".join(f"{label:>{name_width}}" for label in labels))
+    for col, aa in enumerate(amino_acids):
+        print(f"{aa:<5}" + "".join(f"{value * 100:>{name_width}.2f}" for value in aa_matrix[:, col]))
 
     # --- Print Top 3 Amino Acids (as requested) ---
-    print_top_amino_acids(covid_aa_counts, "COVID-19")
-    print_top_amino_acids(flu_aa_counts, "Influenza")
+    for label, counts in zip(labels, aa_counts):
+        print_top_amino_acids(counts, label)
 
     # --- Dynamic Food Recommendation ---
-    covid_top_3_aa = set([aa for aa, count in covid_aa_counts.most_common(3)])
-    flu_top_3_aa = set([aa for aa, count in flu_aa_counts.most_common(3)])
-    all_top_aa = covid_top_3_aa.union(flu_top_3_aa)
-    
+    all_top_aa = set()
+    for counts in aa_counts:
+        all_top_aa.update(aa for aa, count in counts.most_common(3))
+
     find_and_print_food_recommendations(all_top_aa)
 
     # --- Show Plots ---
@@ -225,4 +370,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Error-tolerant overlap verification for noisy reads.
+
+The exact check of the greedy assemblers (`tail.endswith(...)`) fails on
+the first sequencing error. Here an overlap is accepted when the suffix
+of the left read aligns to a prefix of the right read with few
+mismatches and indels.
+
+The alignment uses Myers' bit-parallel edit distance (Python integers
+as bit vectors, one bit per base of the left suffix), in its global
+form: the alignment starts at the first base of both strings and may end
+anywhere in the right read near the expected overlap end. The text is
+cut to the expected overlap length plus the band, so one check costs
+O(overlap + band) word operations instead of a full O(overlap^2) DP.
+
+make_banded_verifier() builds a `verify` function for
+minimizers.minimizer_overlaps(): it returns the length of the matched
+prefix of the right read (which can differ from the left suffix by the
+indels), or 0 if the identity is too low.
+"""
+
+_TO_BITS = {base: str.maketrans({b: ('1' if b == base else '0') for b in "ACGTN"})
+            for base in "ACGT"}
+
+
+def _pattern_masks(pattern):
+    """Bit mask of the positions of every base in the pattern (bit i = base i)."""
+    reversed_pattern = pattern[::-1]
+    masks = {}
+    for base, table in _TO_BITS.items():
+        bits = reversed_pattern.translate(table)
+        masks[base] = int(bits, 2) if bits else 0
+    return masks
+
+
+def overlap_edit_distance(left, right, length, band=None):
+    """
+    Edit distance between the last `length` bases of left and the best
+    prefix of right whose length is within `band` of `length`.
+    Returns (edits, right_length). band defaults to 10% of the length.
+    """
+    if band is None:
+        band = max(2, length // 10)
+    pattern = left[len(left) - length:]
+    text = right[:length + band]
+    m = len(pattern)
+    if m == 0:
+        return 0, 0
+
+    masks = _pattern_masks(pattern)
+    all_ones = (1 << m) - 1
+    high = 1 << (m - 1)
+    vp, vn = all_ones, 0  # vertical +1 / -1 deltas of the current column
+    score = m             # D[m][0]: the whole pattern against nothing
+
+    best_edits, best_length = (score, 0) if length <= band else (m + band + 1, 0)
+    for j, base in enumerate(text, 1):
+        eq = masks.get(base, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | (~(xh | vp) & all_ones)
+        hn = vp & xh
+        if hp & high:
+            score += 1
+        elif hn & high:
+            score -= 1
+        # Global alignment: the top row grows by one per text base
+        hp = ((hp << 1) | 1) & all_ones
+        hn = (hn << 1) & all_ones
+        vp = hn | (~(xv | hp) & all_ones)
+        vn = hp & xv
+
+        if abs(j - length) <= band and score < best_edits:
+            best_edits, best_length = score, j
+    return best_edits, best_length
+
+
+def make_banded_verifier(min_identity=0.9, max_errors=None, band=None):
+    """
+    Returns verify(left, right, length) for minimizer_overlaps(): the
+    matched length of right if the last `length` bases of left align to
+    it with identity >= min_identity (and at most max_errors edits, if
+    given), else 0.
+    """
+    def verify(left, right, length):
+        if left.endswith(right[:length]):  # Most true overlaps have no error
+            return length
+        edits, right_length = overlap_edit_distance(left, right, length, band)
+        if max_errors is not None and edits > max_errors:
+            return 0
+        if 1 - edits / max(length, 1) < min_identity:
+            return 0
+        return right_length
+
+    return verify
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark suite for the lab5 assemblers.
+
+Every assembler mode is run over a grid of genome size x coverage x
+repeat content. The genome and the reads of a grid point only depend on
+its seed (not on the mode), so all modes assemble exactly the same
+reads, and re-running the suite reproduces the same inputs.
+
+For every run the suite records the assembly time, the memory of the
+job process, the number of contigs, the N50 and the genome fraction
+(share of the distinct reference k-mers, on either strand, found in the
+contigs). The memory is given twice: peak_memory_mb is the peak of the
+whole job (genome and read generation included) and assembly_memory_mb
+is how far the assembly raised that peak above the peak reached before
+it started. Results go to assembly_results/benchmark.json and the plots
+are regenerated from them, so an algorithmic regression shows up as a
+number that can be compared between two runs.
+
+The runs are made one at a time by default, so concurrent jobs do not
+compete for the cores and memory bandwidth being measured; --workers=N
+runs N jobs at once for a quicker, noisier pass:
+
+    python benchmark.py [modes] [quick|full] [error_profile] [--workers=N]
+    python benchmark.py compare old.json new.json
+"""
+
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from de_bruijn import count_kmers
+from experiment_runner import contig_stats, job_seed, peak_memory_mb, run_jobs
+from lab5_2 import assemble_samples, generate_mock_genome, take_samples
+
+MIN_SAMPLE_LEN = 100
+MAX_SAMPLE_LEN = 150
+MIN_OVERLAP = 20
+CG_PERCENT = 45.0
+REPEAT_LEN = 300  # Longer than a read, so repeats are really ambiguous
+REPEAT_DIVERGENCE = 0.01
+FRACTION_K = 31
+
+# (genome sizes, coverages, repeat copies per 10 kb)
+GRIDS = {
+    'quick': ((10_000, 50_000), (8, 16), (0, 2)),
+    'full': ((10_000, 100_000, 1_000_000), (5, 10, 20), (0, 1, 5)),
+}
+MODES = ("greedy", "contigs", "graph", "minimizer", "noisy", "dbg")
+
+
+# --- 1. Metrics ---
+
+def genome_fraction(genome, contigs, k=FRACTION_K):
+    """
+    Fraction of the distinct k-mers of the reference (either strand) that
+    appear in the contigs.
+    """
+    reference, _ = count_kmers([genome], k, both_strands=True)
+    if len(reference) == 0:
+        return 0.0
+    contigs = [contig for contig in contigs if len(contig) >= k]
+    if not contigs:
+        return 0.0
+    assembled, _ = count_kmers(contigs, k, both_strands=True)
+    return float(np.isin(reference, assembled, assume_unique=True).mean())
+
+
+# --- 2. Jobs ---
+
+def make_benchmark_jobs(modes=MODES, grid='quick', replicates=1, base_seed=0, profile='none'):
+    """
+    One job per mode and grid point; the seed ignores the mode. The reads
+    carry the errors of the given read_simulator profile.
+    """
+    sizes, coverages, repeat_levels = GRIDS[grid]
+    jobs = []
+    for size in sizes:
+        for coverage in coverages:
+            for repeats in repeat_levels:
+                for replicate in range(replicates):
+                    seed = job_seed(f"{size}bp:{repeats}rep", coverage, replicate, base_seed)
+                    for mode in modes:
+                        jobs.append({
+                            'mode': mode,
+                            'genome_size': size,
+                            'coverage': coverage,
+                            'repeats_per_10kb': repeats,
+                            'replicate': replicate,
+                            'seed': seed,
+                            'profile': profile,
+                        })
+    return jobs
+
+
+def run_benchmark_job(job):
+    """Builds the genome and reads of a grid point, assembles and measures."""
+    random.seed(job['seed'])
+    genome = generate_mock_genome(job['genome_size'], CG_PERCENT,
+                                  repeat_copies=job['genome_size'] * job['repeats_per_10kb'] // 10_000,
+                                  repeat_len=REPEAT_LEN, repeat_divergence=REPEAT_DIVERGENCE)
+    num_samples = int(len(genome) * job['coverage'] / ((MIN_SAMPLE_LEN + MAX_SAMPLE_LEN) / 2))
+    samples = take_samples(genome, num_samples, MIN_SAMPLE_LEN, MAX_SAMPLE_LEN,
+                           profile=job.get('profile', 'none'))
+
+    input_memory_mb = peak_memory_mb()
+    start = time.perf_counter()
+    contigs = assemble_samples(samples, job['mode'], MIN_OVERLAP)
+    assembly_s = time.perf_counter() - start
+    job_memory_mb = peak_memory_mb()
+
+    row = failed_benchmark_row(job, 'ok')
+    row.update({
+        'genome_length': len(genome),
+        'num_samples': len(samples),
+        'assembly_s': round(assembly_s, 4),
+        'peak_memory_mb': job_memory_mb,
+        'assembly_memory_mb': (round(job_memory_mb - input_memory_mb, 1)
+                               if job_memory_mb is not None else None),
+        'genome_fraction': round(genome_fraction(genome, contigs), 4),
+    })
+    row.update(contig_stats(contigs))
+    return row
+
+
+def failed_benchmark_row(job, status):
+    """Result row without measurements (also the base of successful rows)."""
+    row = dict(job)
+    row['status'] = status
+    return row
+
+
+def _print_benchmark_row(row):
+    """One progress line per finished run."""
+    point = f"{row['mode']:8s} {row['genome_size']:>9} bp {row['coverage']:>3}x {row['repeats_per_10kb']} rep"
+    if row['status'] == 'ok':
+        print(f"   {point}: {row['assembly_s']:8.2f} s  N50 {row['n50']:>8}  "
+              f"fraction {row['genome_fraction']:.3f}")
+    else:
+        print(f"   {point}: {row['status']}")
+
+
+# --- 3. Output ---
+
+def write_benchmark(results, filepath, grid, profile='none'):
+    """Writes the results and the run environment as JSON."""
+    document = {
+        'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'grid': grid,
+        'error_profile': profile,
+        'parameters': {
+            'min_sample_len': MIN_SAMPLE_LEN, 'max_sample_len': MAX_SAMPLE_LEN,
+            'min_overlap': MIN_OVERLAP, 'cg_percent': CG_PERCENT,
+            'repeat_len': REPEAT_LEN, 'repeat_divergence': REPEAT_DIVERGENCE,
+            'fraction_k': FRACTION_K,
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+        },
+        'results': results,
+    }
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=1)
+    print(f"Benchmark results saved to: {filepath}")
+
+
+def plot_benchmark(results, folder):
+    """Regenerates the scaling plots from the benchmark results."""
+    ok = [row for row in results if row['status'] == 'ok']
+    if not ok:
+        return
+    modes = sorted({row['mode'] for row in ok})
+    plots = [
+        ('assembly_s', 'Assembly time (s)', 'benchmark_time.png', True),
+        ('peak_memory_mb', 'Peak memory of the job (MB)', 'benchmark_memory.png', True),
+        ('assembly_memory_mb', 'Peak memory added by the assembly (MB)',
+         'benchmark_assembly_memory.png', False),
+        ('n50', 'N50 (bp)', 'benchmark_n50.png', True),
+        ('genome_fraction', 'Genome fraction', 'benchmark_fraction.png', False),
+    ]
+    repeat_levels = sorted({row['repeats_per_10kb'] for row in ok})
+
+    for metric, label, filename, log_scale in plots:
+        fig, axes = plt.subplots(1, len(repeat_levels), figsize=(6 * len(repeat_levels), 5),
+                                 squeeze=False, sharey=True)
+        for ax, repeats in zip(axes[0], repeat_levels):
+            for mode in modes:
+                # Mean over coverages and replicates at every genome size
+                rows = [r for r in ok if r['mode'] == mode and r['repeats_per_10kb'] == repeats
+                        and r[metric] is not None]
+                sizes = sorted({r['genome_size'] for r in rows})
+                values = [np.mean([r[metric] for r in rows if r['genome_size'] == size])
+                          for size in sizes]
+                ax.plot(sizes, values, marker='o', label=mode)
+            ax.set_xscale('log')
+            if log_scale:
+                ax.set_yscale('log')
+            ax.set_title(f"{repeats} repeats / 10 kb")
+            ax.set_xlabel('Genome size (bp)')
+            ax.grid(True, linestyle='--', alpha=0.5)
+        axes[0][0].set_ylabel(label)
+        axes[0][0].legend()
+        fig.tight_layout()
+        filepath = os.path.join(folder, filename)
+        fig.savefig(filepath)
+        plt.close(fig)
+        print(f"Plot saved to: {filepath}")
+
+
+def compare_benchmarks(old_path, new_path, tolerance=0.2):
+    """
+    Prints the runs whose time, memories, N50 or genome fraction got worse
+    by more than `tolerance` (relative) between two benchmark files.
+    Returns the number of regressions.
+    """
+    def load(path):
+        with open(path, encoding='utf-8') as f:
+            rows = json.load(f)['results']
+        return {(r['mode'], r['genome_size'], r['coverage'], r['repeats_per_10kb'],
+                 r['replicate']): r for r in rows}
+
+    old, new = load(old_path), load(new_path)
+    # metric -> True if higher is better
+    metrics = {'assembly_s': False, 'peak_memory_mb': False, 'assembly_memory_mb': False,
+               'n50': True, 'genome_fraction': True}
+    regressions = 0
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        if before['status'] == 'ok' and after['status'] != 'ok':
+            print(f"{key}: {after['status']}")
+            regressions += 1
+            continue
+        if before['status'] != 'ok' or after['status'] != 'ok':
+            continue
+        for metric, higher_is_better in metrics.items():
+            a, b = before.get(metric), after.get(metric)
+            if not a or b is None:
+                continue
+            change = (b - a) / a
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                print(f"{key}: {metric} {a} -> {b} ({change:+.0%})")
+                regressions += 1
+    print(f"{regressions} regressions found.")
+    return regressions
+
+
+def main():
+    if len(sys.argv) > 3 and sys.argv[1] == "compare":
+        compare_benchmarks(sys.argv[2], sys.argv[3])
+        return
+
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    workers = next((int(arg.split("=", 1)[1]) for arg in sys.argv[1:] if arg.startswith("--workers=")), 1)
+    modes = args[0].split(",") if len(args) > 0 else MODES
+    grid = args[1] if len(args) > 1 else 'quick'
+    profile = args[2] if len(args) > 2 else 'none'
+    folder = "assembly_results"
+    os.makedirs(folder, exist_ok=True)
+
+    jobs = make_benchmark_jobs(modes, grid, profile=profile)
+    print(f"--- Running {len(jobs)} benchmark runs ({grid} grid, {profile} reads, "
+          f"{workers} at a time) ---")
+    results = run_jobs(jobs, max_workers=workers, timeout=900, job_function=run_benchmark_job,
+                       failed_row=failed_benchmark_row, print_row=_print_benchmark_row)
+
+    write_benchmark(results, os.path.join(folder, "benchmark.json"), grid, profile)
+    plot_benchmark(results, folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""
+De Bruijn graph assembler for the lab5 `samples` (reads).
+
+Unlike the greedy extender, which stops at the first repeat, this mode
+cuts the reads into k-mers, builds the graph of (k-1)-overlaps between
+them and reports every unambiguous path (unitig) as a contig.
+
+- k-mers are 2-bit encoded into uint64 values (A=0, C=1, G=2, T=3),
+  so k can go up to 31. They are counted in chunks of reads, so memory
+  grows with the number of distinct k-mers, not with the read volume.
+- The graph is never stored as adjacency lists: the neighbours of a
+  k-mer are found by shifting its code and binary-searching the sorted
+  k-mer array.
+- Short dead-end branches (tips) and parallel branches between the same
+  two k-mers (bubbles) are removed before the unitigs are reported.
+- Reads come from both strands, so by default k-mers are counted under
+  their canonical code (the smaller of the k-mer and its reverse
+  complement), which keeps the count arrays at one entry per k-mer pair.
+  Only the solid k-mers are expanded to both strands for the graph,
+  which then holds both strands of the genome: every contig appears
+  twice (once per strand) and only one copy of each pair is reported.
+"""
+
+import numpy as np
+
+# Byte -> 2-bit base code; 4 marks anything that is not A/C/G/T
+_BASE_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _base in enumerate("ACGT"):
+    _BASE_CODES[ord(_base)] = _code
+    _BASE_CODES[ord(_base.lower())] = _code
+
+_BASE_LETTERS = np.frombuffer(b"ACGT", dtype=np.uint8)
+_COMPLEMENT = str.maketrans("ACGT", "TGCA")
+
+
+# --- 1. k-mer counting ---
+
+def _chunk_kmers(reads, k):
+    """
+    Returns the 2-bit codes of every k-mer of a chunk of reads. Windows
+    that cross a read boundary or contain an unknown base are dropped.
+    """
+    lengths = np.fromiter((len(read) for read in reads), dtype=np.int64, count=len(reads))
+    codes = _BASE_CODES[np.frombuffer("".join(reads).encode('ascii'), dtype=np.uint8)]
+    num_windows = len(codes) - k + 1
+    if num_windows <= 0:
+        return np.empty(0, dtype=np.uint64)
+
+    # Rolling 2-bit encoding, plus a running count of unknown bases
+    codes64 = (codes & 3).astype(np.uint64)
+    unknown_before = np.concatenate([[0], np.cumsum(codes > 3)])
+    unknown = unknown_before[k:] != unknown_before[:num_windows]
+    values = np.zeros(num_windows, dtype=np.uint64)
+    two = np.uint64(2)
+    for j in range(k):
+        values <<= two
+        values |= codes64[j:j + num_windows]
+
+    # A window is valid only if it ends inside the read it starts in
+    read_starts = np.cumsum(lengths) - lengths
+    read_of_window = np.repeat(np.arange(len(reads)), lengths)[:num_windows]
+    offset = np.arange(num_windows) - read_starts[read_of_window]
+    valid = ~unknown & (offset <= lengths[read_of_window] - k)
+    return values[valid]
+
+
+def reverse_complement_codes(values, k):
+    """Reverse complements 2-bit k-mer codes (complement is 3 - code)."""
+    values = values ^ np.uint64((1 << (2 * k)) - 1)
+    result = np.zeros_like(values)
+    two, three = np.uint64(2), np.uint64(3)
+    for _ in range(k):
+        result = (result << two) | (values & three)
+        values = values >> two
+    return result
+
+
+def _sum_counts(kmers, counts):
+    """
+    Sorts (k-mer, count) pairs and adds up the counts of equal k-mers
+    (a stable sort merges runs that are already sorted).
+    """
+    order = np.argsort(kmers, kind='stable')
+    kmers, counts = kmers[order], counts[order]
+    if len(kmers) == 0:
+        return kmers, counts
+    starts = np.flatnonzero(np.concatenate([[True], kmers[1:] != kmers[:-1]]))
+    return kmers[starts], np.add.reduceat(counts, starts)
+
+
+def count_kmers(samples, k, chunk_bases=1 << 21, both_strands=False):
+    """
+    Counts the k-mers of all samples. Returns (kmers, counts): the sorted
+    distinct k-mer codes and how many times each one was seen.
+    With both_strands, k-mers are counted under their canonical code, so a
+    count covers both strands (a palindrome counts once per strand).
+    Each chunk is counted on its own; the chunk counts are merged into the
+    totals only once they outgrow them, so every k-mer is merged a
+    logarithmic number of times instead of once per chunk.
+    """
+    if not 1 <= k <= 31:
+        raise ValueError("k must be between 1 and 31 for 2-bit uint64 k-mers.")
+
+    kmers = np.empty(0, dtype=np.uint64)
+    counts = np.empty(0, dtype=np.int64)
+    pending, pending_size = [], 0
+
+    chunk = []
+    chunk_size = 0
+    for i, sample in enumerate(samples):
+        chunk.append(sample)
+        chunk_size += len(sample)
+        if chunk_size < chunk_bases and i < len(samples) - 1:
+            continue
+
+        values = _chunk_kmers(chunk, k)
+        if both_strands:
+            values = np.minimum(values, reverse_complement_codes(values, k))
+        if len(values):
+            values.sort()
+            starts = np.flatnonzero(np.concatenate([[True], values[1:] != values[:-1]]))
+            pending.append((values[starts], np.diff(np.append(starts, len(values)))))
+            pending_size += len(starts)
+        chunk = []
+        chunk_size = 0
+
+        if pending_size >= len(kmers) or i == len(samples) - 1:
+            kmers, counts = _sum_counts(np.concatenate([kmers] + [p[0] for p in pending]),
+                                        np.concatenate([counts] + [p[1] for p in pending]))
+            pending, pending_size = [], 0
+
+    if both_strands:
+        counts[kmers == reverse_complement_codes(kmers, k)] *= 2
+    return kmers, counts
+
+
+def both_strand_kmers(kmers, counts, k):
+    """
+    Expands canonical k-mers to the sorted k-mers of both strands, each
+    reverse complement getting the count of its canonical k-mer.
+    """
+    rc_kmers = reverse_complement_codes(kmers, k)
+    other = rc_kmers != kmers  # a palindrome is its own reverse complement
+    kmers = np.concatenate([kmers, rc_kmers[other]])
+    counts = np.concatenate([counts, counts[other]])
+    order = np.argsort(kmers, kind='stable')
+    return kmers[order], counts[order]
+
+
+def _reverse_complement(sequence):
+    """Reverse complement of a contig string."""
+    return sequence.translate(_COMPLEMENT)[::-1]
+
+
+def decode_kmer(value, k):
+    """Turns a 2-bit k-mer code back into its DNA string."""
+    value = int(value)
+    bases = []
+    for _ in range(k):
+        bases.append("ACGT"[value & 3])
+        value >>= 2
+    return "".join(reversed(bases))
+
+
+# --- 2. Implicit graph ---
+
+def _lookup(kmers, queries):
+    """
+    Returns the index of every query in the sorted k-mer array, or -1
+    where the query is not a k-mer of the graph.
+    """
+    if len(kmers) == 0:
+        return np.full(len(queries), -1, dtype=np.int64)
+    idx = np.searchsorted(kmers, queries)
+    idx_clipped = np.minimum(idx, len(kmers) - 1)
+    return np.where(kmers[idx_clipped] == queries, idx_clipped, -1)
+
+
+def _neighbours(kmers, k):
+    """
+    Returns (successors, predecessors): two (4, n) arrays holding, for each
+    possible next/previous base, the index of the neighbouring k-mer or -1.
+    """
+    mask = np.uint64((1 << (2 * k)) - 1)
+    high_shift = np.uint64(2 * (k - 1))
+    successors = np.empty((4, len(kmers)), dtype=np.int64)
+    predecessors = np.empty((4, len(kmers)), dtype=np.int64)
+    for base in range(4):
+        b = np.uint64(base)
+        successors[base] = _lookup(kmers, ((kmers << np.uint64(2)) & mask) | b)
+        predecessors[base] = _lookup(kmers, (kmers >> np.uint64(2)) | (b << high_shift))
+    return successors, predecessors
+
+
+# --- 3. Unitig compaction ---
+
+def _build_unitigs(kmers, k):
+    """
+    Compacts the graph into unitigs: maximal chains where every edge
+    x -> y has out-degree(x) == 1 and in-degree(y) == 1.
+    Returns a dict of arrays describing the unitigs (node order, chain
+    boundaries, end-point neighbours), used by cleaning and output.
+    """
+    n = len(kmers)
+    successors, predecessors = _neighbours(kmers, k)
+    out_deg = (successors >= 0).sum(axis=0)
+    in_deg = (predecessors >= 0).sum(axis=0)
+
+    # Unique successor of each node (only meaningful when out_deg == 1)
+    single_succ = successors.max(axis=0)
+    single_pred = predecessors.max(axis=0)
+    link = np.full(n, -1, dtype=np.int64)
+    can_link = (out_deg == 1) & (single_succ >= 0)
+    can_link[can_link] &= in_deg[single_succ[can_link]] == 1
+    link[can_link] = single_succ[can_link]
+    # A node that links to itself is a one-k-mer loop, not a chain
+    link[link == np.arange(n)] = -1
+
+    # List ranking by pointer jumping: tail[x] = last node of x's chain,
+    # dist[x] = number of links from x to that tail
+    tail = np.where(link >= 0, link, np.arange(n))
+    dist = (link >= 0).astype(np.int64)
+    for _ in range(max(1, int(np.ceil(np.log2(max(n, 2)))) + 1)):
+        jumped = tail[tail]
+        if np.array_equal(jumped, tail):
+            break
+        dist = dist + dist[tail]
+        tail = jumped
+
+    # Nodes on pure cycles never reach a real tail (a node without a link);
+    # cut each cycle once and rank it with a short walk (these are rare:
+    # isolated circles)
+    on_cycle = link[tail] != -1
+    if on_cycle.any():
+        visited = np.zeros(n, dtype=bool)
+        link_list = link.tolist()
+        for start in np.flatnonzero(on_cycle):
+            if visited[start]:
+                continue
+            cycle = [start]
+            visited[start] = True
+            node = link_list[start]
+            while node != start:
+                cycle.append(node)
+                visited[node] = True
+                node = link_list[node]
+            # Cut the edge that closes the cycle: the last node becomes the tail
+            for position, node in enumerate(cycle):
+                tail[node] = cycle[-1]
+                dist[node] = len(cycle) - 1 - position
+
+    # Order nodes chain by chain, from the head (largest dist) to the tail
+    order = np.lexsort((-dist, tail))
+    chain_tail = tail[order]
+    boundaries = np.flatnonzero(np.diff(chain_tail)) + 1
+    starts = np.concatenate([[0], boundaries]).astype(np.int64)
+    ends = np.concatenate([boundaries, [n]]).astype(np.int64)
+
+    first = order[starts]
+    last = order[ends - 1]
+    return {
+        'order': order,
+        'starts': starts,
+        'ends': ends,
+        'first': first,
+        'last': last,
+        'in_deg': in_deg[first],
+        'out_deg': out_deg[last],
+        'pred': single_pred[first],
+        'succ': single_succ[last],
+    }
+
+
+def _unitig_sequences(kmers, k, unitigs, selected):
+    """Builds the DNA strings of the selected unitigs."""
+    last_bases = _BASE_LETTERS[(kmers[unitigs['order']] & np.uint64(3)).astype(np.int64)].tobytes()
+    sequences = []
+    for u in selected:
+        start, end = unitigs['starts'][u], unitigs['ends'][u]
+        head = decode_kmer(kmers[unitigs['first'][u]], k)
+        sequences.append(head + last_bases[start + 1:end].decode('ascii'))
+    return sequences
+
+
+# --- 4. Graph cleaning ---
+
+def _mean_coverage(counts, unitigs):
+    """Mean k-mer count of every unitig."""
+    sums = np.add.reduceat(counts[unitigs['order']], unitigs['starts'])
+    return sums / (unitigs['ends'] - unitigs['starts'])
+
+
+def _remove_unitigs(keep, unitigs, drop):
+    """Marks the k-mers of the dropped unitigs as removed."""
+    for u in np.flatnonzero(drop):
+        keep[unitigs['order'][unitigs['starts'][u]:unitigs['ends'][u]]] = False
+
+
+def _tip_mask(unitigs, max_tip_kmers):
+    """
+    Tips are short unitigs with one dead end whose other end joins the
+    rest of the graph (isolated unitigs are kept as contigs).
+    """
+    num_kmers = unitigs['ends'] - unitigs['starts']
+    dead_start = unitigs['in_deg'] == 0
+    dead_end = unitigs['out_deg'] == 0
+    return (dead_start ^ dead_end) & (num_kmers < max_tip_kmers)
+
+
+def _bubble_mask(unitigs, coverage, max_bubble_kmers):
+    """
+    Bubbles are short unitigs that leave the same k-mer and rejoin at the
+    same k-mer. Of each group of parallel branches only the best covered
+    one is kept.
+    """
+    num_kmers = unitigs['ends'] - unitigs['starts']
+    branch = ((unitigs['in_deg'] == 1) & (unitigs['out_deg'] == 1)
+              & (num_kmers <= max_bubble_kmers))
+    drop = np.zeros(len(num_kmers), dtype=bool)
+    candidates = np.flatnonzero(branch)
+    if len(candidates) < 2:
+        return drop
+
+    # Sort branches by (entry, exit, coverage) and drop all but the last
+    # (best covered) branch of every (entry, exit) group
+    entry = unitigs['pred'][candidates]
+    exit_ = unitigs['succ'][candidates]
+    order = np.lexsort((coverage[candidates], exit_, entry))
+    entry, exit_ = entry[order], exit_[order]
+    same_as_next = (entry[:-1] == entry[1:]) & (exit_[:-1] == exit_[1:])
+    drop[candidates[order[:-1][same_as_next]]] = True
+    return drop
+
+
+# --- 5. Assembler ---
+
+def assemble_de_bruijn(samples, k=31, min_count=1, max_tip_kmers=None,
+                       max_bubble_kmers=None, min_contig_len=None, max_rounds=5,
+                       both_strands=True):
+    """
+    Assembles the samples with a De Bruijn graph and returns the contigs
+    (unitigs of the cleaned graph), longest first.
+    - min_count: k-mers seen fewer times are treated as errors
+    - max_tip_kmers: dead-end branches shorter than this are removed (default 2k)
+    - max_bubble_kmers: longest parallel branch collapsed as a bubble (default 2k)
+    - min_contig_len: shorter unitigs are not reported (default 2k)
+    - both_strands: reads may be reverse complemented; each contig is
+      reported once, on whichever strand sorts first
+    """
+    if max_tip_kmers is None:
+        max_tip_kmers = 2 * k
+    if max_bubble_kmers is None:
+        max_bubble_kmers = 2 * k
+    if min_contig_len is None:
+        min_contig_len = 2 * k
+
+    kmers, counts = count_kmers(samples, k, both_strands=both_strands)
+    solid = counts >= min_count
+    kmers, counts = kmers[solid], counts[solid]
+    if both_strands:
+        kmers, counts = both_strand_kmers(kmers, counts, k)
+    if len(kmers) == 0:
+        return []
+
+    for _ in range(max_rounds):
+        unitigs = _build_unitigs(kmers, k)
+        keep = np.ones(len(kmers), dtype=bool)
+        _remove_unitigs(keep, unitigs, _tip_mask(unitigs, max_tip_kmers))
+        if keep.all():
+            coverage = _mean_coverage(counts, unitigs)
+            _remove_unitigs(keep, unitigs, _bubble_mask(unitigs, coverage, max_bubble_kmers))
+        if keep.all():
+            break
+        kmers, counts = kmers[keep], counts[keep]
+    else:
+        unitigs = _build_unitigs(kmers, k)
+
+    lengths = unitigs['ends'] - unitigs['starts'] + k - 1
+    selected = np.flatnonzero(lengths >= min_contig_len)
+    selected = selected[np.argsort(-lengths[selected], kind='stable')]
+    contigs = _unitig_sequences(kmers, k, unitigs, selected)
+    if both_strands:
+        # Keep one contig of every reverse-complement pair
+        contigs = [contig for contig in contigs if contig <= _reverse_complement(contig)]
+    return contigs
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Parallel, real-scale version of the lab5_2 assembly experiment.
+
+Every (virus, coverage, replicate) combination is one job. A job builds
+a mock genome at the *real* length from VIRUS_DATABASE, takes the
+samples and times the assembly. Jobs run in their own process, at most
+max_workers at a time, so that:
+- a job that exceeds the timeout is killed without stopping the others;
+- the peak resident memory of the process is the memory of that job;
+- every job is seeded from (virus, coverage, replicate), so re-running
+  one job alone reproduces exactly the same genome and samples.
+
+All results are written to one CSV table (assembly_results/experiment_results.csv).
+
+Usage: python experiment_runner.py [mode] [workers] [timeout_s] [replicates]
+"""
+
+import csv
+import os
+import random
+import sys
+import time
+import zlib
+import multiprocessing
+from multiprocessing.connection import wait
+
+from lab5_2 import (VIRUS_DATABASE, assemble_samples, calculate_cg_percent,
+                    generate_mock_genome, take_samples)
+
+try:
+    import resource
+except ImportError:  # Windows: no peak memory
+    resource = None
+
+MIN_SAMPLE_LEN = 100
+MAX_SAMPLE_LEN = 150
+MIN_OVERLAP = 10
+
+RESULT_FIELDS = [
+    'virus', 'genome_length', 'cg_percent', 'coverage', 'replicate', 'seed',
+    'mode', 'num_samples', 'status', 'generate_s', 'assembly_s',
+    'peak_memory_mb', 'num_contigs', 'longest_contig', 'total_contig_bp', 'n50',
+]
+
+
+# --- 1. Metrics ---
+
+def n50(lengths):
+    """Length L such that contigs of length >= L hold half of the assembly."""
+    lengths = sorted(lengths, reverse=True)
+    half = sum(lengths) / 2
+    running = 0
+    for length in lengths:
+        running += length
+        if running >= half:
+            return length
+    return 0
+
+
+def contig_stats(contigs):
+    """Number of contigs, longest, total length and N50 of an assembly."""
+    lengths = [len(contig) for contig in contigs if contig]
+    return {
+        'num_contigs': len(lengths),
+        'longest_contig': max(lengths, default=0),
+        'total_contig_bp': sum(lengths),
+        'n50': n50(lengths),
+    }
+
+
+def peak_memory_mb():
+    """Peak resident memory of the current process in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    peak = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    return round(peak, 1)
+
+
+# --- 2. Jobs ---
+
+def job_seed(name, coverage, replicate, base_seed=0):
+    """Stable seed of a job (independent of the other jobs in the grid)."""
+    return zlib.crc32(f"{base_seed}:{name}:{coverage}:{replicate}".encode('utf-8'))
+
+
+def make_jobs(mode="greedy", coverages=(8,), replicates=1, base_seed=0,
+              viruses=VIRUS_DATABASE):
+    """Builds the job list: one job per virus, coverage and replicate."""
+    jobs = []
+    for name, real_cg, _, real_length in viruses:
+        for coverage in coverages:
+            for replicate in range(replicates):
+                jobs.append({
+                    'virus': name,
+                    'real_cg': real_cg,
+                    'genome_length': real_length,
+                    'coverage': coverage,
+                    'replicate': replicate,
+                    'seed': job_seed(name, coverage, replicate, base_seed),
+                    'mode': mode,
+                })
+    return jobs
+
+
+def _empty_result(job, status):
+    """Result row of a job that produced no assembly."""
+    row = {field: '' for field in RESULT_FIELDS}
+    for field in ('virus', 'genome_length', 'coverage', 'replicate', 'seed', 'mode'):
+        row[field] = job[field]
+    row['status'] = status
+    return row
+
+
+def run_job(job):
+    """Runs one job in the current process and returns its result row."""
+    random.seed(job['seed'])
+
+    start = time.perf_counter()
+    genome = generate_mock_genome(job['genome_length'], job['real_cg'])
+    num_samples = int(job['genome_length'] * job['coverage'] /
+                      ((MIN_SAMPLE_LEN + MAX_SAMPLE_LEN) // 2))
+    samples = take_samples(genome, num_samples, MIN_SAMPLE_LEN, MAX_SAMPLE_LEN)
+    random.shuffle(samples)
+    generate_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    contigs = assemble_samples(samples, job['mode'], MIN_OVERLAP)
+    assembly_s = time.perf_counter() - start
+
+    row = _empty_result(job, 'ok')
+    row.update({
+        'genome_length': len(genome),
+        'cg_percent': round(calculate_cg_percent(genome), 2),
+        'num_samples': len(samples),
+        'generate_s': round(generate_s, 4),
+        'assembly_s': round(assembly_s, 4),
+        'peak_memory_mb': peak_memory_mb(),
+    })
+    row.update(contig_stats(contigs))
+    return row
+
+
+def _job_process(job_function, failed_row, job, connection):
+    """Process entry point: runs the job and sends the row back."""
+    try:
+        row = job_function(job)
+    except Exception as e:
+        row = failed_row(job, f"error: {e}")
+    connection.send(row)
+    connection.close()
+
+
+# --- 3. Scheduler ---
+
+def run_jobs(jobs, max_workers=None, timeout=600, job_function=run_job,
+             failed_row=_empty_result, print_row=None):
+    """
+    Runs job_function(job) for every job in its own process, at most
+    max_workers at a time. Jobs still running after `timeout` seconds are
+    terminated and reported as failed_row(job, 'timeout'). Returns the
+    result rows in job order.
+    """
+    if print_row is None:
+        print_row = _print_row
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    results = [None] * len(jobs)
+    pending = list(range(len(jobs)))[::-1]
+    running = {}  # connection -> (job index, process, start time)
+
+    while pending or running:
+        while pending and len(running) < max_workers:
+            job_index = pending.pop()
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = multiprocessing.Process(target=_job_process,
+                                              args=(job_function, failed_row, jobs[job_index], sender))
+            process.start()
+            sender.close()
+            running[receiver] = (job_index, process, time.monotonic())
+
+        for connection in wait(list(running), timeout=0.5):
+            job_index, process, _ = running.pop(connection)
+            try:
+                results[job_index] = connection.recv()
+            except EOFError:  # The process died without an answer (e.g. out of memory)
+                results[job_index] = failed_row(jobs[job_index], "crashed")
+            process.join()
+            connection.close()
+            print_row(results[job_index])
+
+        now = time.monotonic()
+        for connection, (job_index, process, started) in list(running.items()):
+            if now - started > timeout:
+                process.terminate()
+                process.join()
+                connection.close()
+                del running[connection]
+                results[job_index] = failed_row(jobs[job_index], "timeout")
+                print_row(results[job_index])
+
+    return results
+
+
+# --- 4. Output ---
+
+def _print_row(row):
+    """One progress line per finished job."""
+    if row['status'] == 'ok':
+        print(f"   {row['virus']} ({row['genome_length']} bp, {row['coverage']}x, "
+              f"rep {row['replicate']}): {row['assembly_s']:.2f} s, "
+              f"{row['num_contigs']} contigs, N50 {row['n50']} bp")
+    else:
+        print(f"   {row['virus']} ({row['coverage']}x, rep {row['replicate']}): {row['status']}")
+
+
+def write_results(results, filepath):
+    """Writes the result rows as a CSV table."""
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"Results table saved to: {filepath}")
+
+
+def main():
+    mode = sys.argv[1] if len(sys.argv) > 1 else "greedy"
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    timeout = float(sys.argv[3]) if len(sys.argv) > 3 else 600
+    replicates = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+    coverages = (8,)
+
+    os.makedirs("assembly_results", exist_ok=True)
+    jobs = make_jobs(mode, coverages, replicates)
+    print(f"--- Running {len(jobs)} assembly jobs (mode={mode}, timeout={timeout:g} s) ---")
+
+    start = time.perf_counter()
+    results = run_jobs(jobs, max_workers, timeout)
+    print(f"--- All jobs finished in {time.perf_counter() - start:.1f} s ---")
+
+    write_results(results, os.path.join("assembly_results", "experiment_results.csv"))
+
+
+if __name__ == "__main__":
+    main()
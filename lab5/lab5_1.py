@@ -1,4 +1,10 @@
 import random
+import sys
+from overlap_index import (assemble_contigs, build_end_index, find_best_extension,
+                           oriented, remove_sample, reverse_complement)
+from de_bruijn import assemble_de_bruijn
+from read_simulator import chunk_to_strings, simulate_reads
+from suffix_overlaps import build_overlap_graph, find_all_overlaps, rebuild_from_overlap_graph
 
 def parse_fasta(filename="covid.fasta"):
     """
@@ -35,30 +41,20 @@ def parse_fasta(filename="covid.fasta"):
     print(f"Successfully parsed {len(sequence)} total bases.\n")
     return sequence
 
-def take_samples(sequence, num_samples, min_len, max_len):
+def take_samples(sequence, num_samples, min_len, max_len, both_strands=True):
     """
     Takes random samples (reads) from a given sequence.
+    With both_strands, each read comes from the reverse strand (reverse
+    complemented) with probability 0.5, like real sequencing reads.
+    The reads are drawn in NumPy chunks by read_simulator.py.
     """
     print(f"--- 2. Taking {num_samples} random samples ---")
+    if len(sequence) < min_len:
+        print("Warning: Sequence is shorter than sample length.")
     samples = []
-    seq_len = len(sequence)
-    
-    for _ in range(num_samples):
-        # 1. Choose a random length for this sample
-        sample_len = random.randint(min_len, max_len)
-        
-        # 2. Choose a random starting position
-        # Ensure the sample doesn't go past the end of the sequence
-        max_start_index = seq_len - sample_len
-        if max_start_index < 0:
-            print("Warning: Sequence is shorter than sample length.")
-            continue
-            
-        start_index = random.randint(0, max_start_index)
-        
-        # 3. Extract the sample and add to our list
-        sample = sequence[start_index : start_index + sample_len]
-        samples.append(sample)
+    for chunk in simulate_reads(sequence, num_samples, min_len, max_len,
+                                both_strands=both_strands, seed=random.getrandbits(64)):
+        samples.extend(chunk_to_strings(chunk))
         
     print(f"Generated {len(samples)} samples (e.g., '{samples[0]}...').\n")
     return samples
@@ -67,6 +63,9 @@ def rebuild_sequence_greedy(samples, min_overlap):
     """
     Attempts to rebuild the sequence using a simple greedy overlap algorithm.
     This demonstrates the flaws of the approach.
+    Extension candidates come from a read-end k-mer index (overlap_index.py)
+    instead of a scan over every unused sample; reads from the reverse
+    strand are used reverse complemented.
     """
     print(f"--- 3. Attempting to rebuild sequence (min_overlap={min_overlap}) ---")
     
@@ -74,61 +73,95 @@ def rebuild_sequence_greedy(samples, min_overlap):
         print("No samples to rebuild from.")
         return ""
 
-    # 1. Start our assembly with the first sample and remove it from the pool
-    # We use a set for efficient removal of used indices
+    # 1. Index every sample by its first and last min_overlap bases
+    index = build_end_index(samples, min_overlap)
+
+    # 2. Start our assembly with the first sample and remove it from the pool
     rebuilt_sequence = samples[0]
-    used_indices = {0}
+    used_count = 1
+    remove_sample(index, samples, 0, min_overlap)
     
     # We'll try to extend the right side of our sequence
     while True:
-        best_overlap_len = -1
-        best_sample_index = -1
-        
         # This is the "tail" we are trying to find an overlap for
         # We only check the end of our current sequence for efficiency
         search_tail = rebuilt_sequence[-150:] 
         
-        # 2. Iterate through all *unused* samples
-        for i in range(len(samples)):
-            if i in used_indices:
-                continue
-                
-            current_sample = samples[i]
-            
-            # 3. Check for the best possible overlap with this sample
-            # We check from the largest possible overlap down to the minimum
-            for overlap_len in range(min(len(search_tail), len(current_sample)), min_overlap - 1, -1):
-                
-                if search_tail.endswith(current_sample[:overlap_len]):
-                    # Found a valid overlap!
-                    # Is it the best one we've found *in this pass*?
-                    if overlap_len > best_overlap_len:
-                        best_overlap_len = overlap_len
-                        best_sample_index = i
-                    
-                    # We found the longest overlap for *this sample*,
-                    # so we can stop checking shorter overlaps for it.
-                    break 
+        # 3. Look up the longest overlap among the *unused* samples
+        best_sample_index, best_overlap_len, is_reverse = find_best_extension(
+            search_tail, samples, index, min_overlap)
         
-        # 4. Did we find any valid overlap in this entire pass?
+        # 4. Did we find any valid overlap?
         if best_sample_index != -1:
             # Yes! Add the new, non-overlapping part to our sequence
-            best_sample = samples[best_sample_index]
+            best_sample = oriented(samples[best_sample_index], is_reverse)
             rebuilt_sequence += best_sample[best_overlap_len:]
             
             # Mark this sample as used
-            used_indices.add(best_sample_index)
+            remove_sample(index, samples, best_sample_index, min_overlap)
+            used_count += 1
         else:
             # No. We are "stuck". No more samples overlap with the end.
             # This is a "coverage gap" or an unresolvable repeat.
             print("Assembly stuck. No more forward overlaps found.")
             break
             
-    print(f"Assembly finished. Found {len(used_indices)} total overlapping samples.\n")
+    print(f"Assembly finished. Found {used_count} total overlapping samples.\n")
+    return rebuilt_sequence
+
+def rebuild_sequence_de_bruijn(samples, k):
+    """
+    Rebuilds the sequence with the De Bruijn graph assembler (de_bruijn.py).
+    Instead of stopping at the first repeat, it returns every contig it can
+    build; the longest one is used for the comparison.
+    """
+    print(f"--- 3. Rebuilding sequence with a De Bruijn graph (k={k}) ---")
+    contigs = assemble_de_bruijn(samples, k=k)
+    if not contigs:
+        print("No contigs could be built.\n")
+        return []
+    print(f"Assembly finished. Built {len(contigs)} contigs "
+          f"(longest {len(contigs[0])} bp, total {sum(len(c) for c in contigs)} bp).\n")
+    return contigs
+
+def rebuild_sequence_overlap_graph(samples, min_overlap):
+    """
+    Rebuilds the sequence greedily from a precomputed overlap graph.
+    All suffix-prefix overlaps are found once with an FM-index
+    (suffix_overlaps.py), so the layout never rescans the reads.
+    """
+    print(f"--- 3. Rebuilding sequence from the overlap graph (min_overlap={min_overlap}) ---")
+    src, dst, length = find_all_overlaps(samples, min_overlap, both_strands=True)
+    print(f"Found {len(src)} suffix-prefix overlaps between samples (both strands).")
+    graph = build_overlap_graph(2 * len(samples), src, dst, length)
+    rebuilt_sequence, used_count = rebuild_from_overlap_graph(samples, graph)
+    print(f"Assembly finished. Found {used_count} total overlapping samples.\n")
     return rebuilt_sequence
 
+def rebuild_contigs_greedy(samples, min_overlap):
+    """
+    Rebuilds the whole read set as contigs: every contig is extended to
+    the right and to the left, and unused samples seed new contigs
+    (overlap_index.assemble_contigs). Returns the contigs, longest first.
+    """
+    print(f"--- 3. Rebuilding contigs in both directions (min_overlap={min_overlap}) ---")
+    contigs = assemble_contigs(samples, min_overlap)
+    if not contigs:
+        print("No contigs could be built.\n")
+        return []
+    print(f"Assembly finished. Built {len(contigs)} contigs from {len(samples)} samples.")
+    for i, contig in enumerate(contigs[:5], 1):
+        print(f"  Contig {i}: {len(contig['sequence'])} bp from {len(contig['reads'])} samples")
+    print()
+    return contigs
+
 def main():
     # --- Parameters ---
+    # Run "python lab5_1.py dbg" for the De Bruijn graph assembler,
+    # "python lab5_1.py graph" for the precomputed overlap graph,
+    # or "python lab5_1.py contigs" for two-way multi-contig extension
+    ASSEMBLY_MODE = sys.argv[1] if len(sys.argv) > 1 else "greedy"
+    KMER_SIZE = 31
     FASTA_FILE = "covid.fasta"
     SEQUENCE_LENGTH = 3000
     NUM_SAMPLES = 2000
@@ -150,7 +183,16 @@ def main():
     # We shuffle the samples to better simulate the "random"
     # nature of which sample we pick first.
     random.shuffle(samples) 
-    rebuilt_sequence = rebuild_sequence_greedy(samples, MIN_OVERLAP)
+    if ASSEMBLY_MODE == "dbg":
+        contigs = rebuild_sequence_de_bruijn(samples, KMER_SIZE)
+        rebuilt_sequence = contigs[0] if contigs else ""
+    elif ASSEMBLY_MODE == "contigs":
+        contigs = rebuild_contigs_greedy(samples, MIN_OVERLAP)
+        rebuilt_sequence = contigs[0]['sequence'] if contigs else ""
+    elif ASSEMBLY_MODE == "graph":
+        rebuilt_sequence = rebuild_sequence_overlap_graph(samples, MIN_OVERLAP)
+    else:
+        rebuilt_sequence = rebuild_sequence_greedy(samples, MIN_OVERLAP)
     
     # --- Step 4: Compare Results ---
     print("--- 4. Final Comparison ---")
@@ -163,7 +205,8 @@ def main():
     print("\nRebuilt Sequence (first 100 bases):")
     print(rebuilt_sequence[:100])
     
-    if len(original_sequence) != len(rebuilt_sequence) or original_sequence != rebuilt_sequence:
+    # The assembly may come out as the reverse strand of the original
+    if rebuilt_sequence not in (original_sequence, reverse_complement(original_sequence)):
         print("\n*** RESULT: The rebuilt sequence DOES NOT match the original. ***")
         print("This demonstrates the algorithm's failure due to coverage gaps and/or repeat ambiguity.")
     else:
@@ -8,7 +8,15 @@ Created on Thu Oct 30 15:28:10 2025
 import random
 import time
 import os
+import numpy as np
 import matplotlib.pyplot as plt
+from overlap_index import (assemble_contigs, build_end_index, find_best_extension,
+                           oriented, remove_sample)
+from banded_overlap import make_banded_verifier
+from de_bruijn import assemble_de_bruijn
+from minimizers import minimizer_overlaps
+from read_simulator import chunk_to_strings, simulate_reads
+from suffix_overlaps import build_overlap_graph, find_all_overlaps, rebuild_from_overlap_graph
 
 # --- Helper Functions ---
 
@@ -22,54 +30,62 @@ def calculate_cg_percent(sequence):
     g_count = sequence.count('G')
     return (c_count + g_count) / total_len * 100
 
-def generate_mock_genome(length, cg_percent):
+_BASE_LETTERS = np.frombuffer(b"ACGT", dtype=np.uint8)
+
+def generate_mock_genome(length, cg_percent, repeat_copies=None, repeat_len=50,
+                         repeat_divergence=0.0, seed=None):
     """
     Generates a random DNA sequence of a specific length
     and approximate C+G content.
+    The bases are drawn with the exact composition and shuffled as one
+    NumPy array, then a repeat family is spliced in with a single insert:
+    - repeat_copies: number of copies (default: 1 per 1000 bp)
+    - repeat_len: length of the repeat unit in bp
+    - repeat_divergence: fraction of bases of each copy that are mutated
+    The seed defaults to one drawn from `random`, so random.seed() still
+    makes the genome reproducible.
     """
-    target_cg_count = int(length * (cg_percent / 100))
-    target_at_count = length - target_cg_count
-    
-    # Create the nucleotides
-    genome = (['C'] * (target_cg_count // 2) +
-              ['G'] * (target_cg_count - (target_cg_count // 2)) +
-              ['A'] * (target_at_count // 2) +
-              ['T'] * (target_at_count - (target_at_count // 2)))
-    
-    # Add one 'C', 'G', 'A', 'T' to ensure no division by zero in some cases
-    genome.extend(['A', 'T', 'C', 'G'])
-    
-    # Fill up to length
-    while len(genome) < length:
-        genome.append(random.choice(['A', 'T', 'C', 'G']))
-        
-    random.shuffle(genome)
-    
+    if seed is None:
+        seed = random.getrandbits(64)
+    rng = np.random.default_rng(seed)
+    if repeat_copies is None:
+        repeat_copies = length // 1000 # Add 1 repeat per 1000bp
+
+    # Exact composition: A=0, C=1, G=2, T=3
+    cg_count = int(length * (cg_percent / 100))
+    at_count = length - cg_count
+    composition = [at_count // 2, cg_count // 2, cg_count - cg_count // 2,
+                   at_count - at_count // 2]
+    genome = rng.permutation(np.repeat(np.arange(4, dtype=np.uint8), composition))
+
     # To make the assembly problem *realistically* difficult,
-    # we will add a few repeats.
-    repeat_seq = "".join(random.choices(genome, k=50))
-    for _ in range(length // 1000): # Add 1 repeat per 1000bp
-        insert_pos = random.randint(0, len(genome) - 50)
-        genome.insert(insert_pos, repeat_seq)
+    # we add a family of (possibly diverged) repeats.
+    if repeat_copies > 0 and repeat_len > 0 and length > 0:
+        unit = genome[rng.integers(0, length, size=repeat_len)]
+        copies = np.tile(unit, (repeat_copies, 1))
+        mutated = rng.random(copies.shape) < repeat_divergence
+        shift = rng.integers(1, 4, size=copies.shape, dtype=np.uint8)
+        copies[mutated] = (copies[mutated] + shift[mutated]) % 4
+
+        positions = np.sort(rng.integers(0, length + 1, size=repeat_copies))
+        genome = np.insert(genome, np.repeat(positions, repeat_len), copies.ravel())
 
-    return "".join(genome)
+    return _BASE_LETTERS[genome].tobytes().decode('ascii')
 
 # --- Core Algorithm Functions (from our previous work) ---
 
-def take_samples(sequence, num_samples, min_len, max_len):
-    """Takes random samples (reads) from a given sequence."""
+def take_samples(sequence, num_samples, min_len, max_len, both_strands=True, profile='none'):
+    """
+    Takes random samples (reads) from a given sequence.
+    With both_strands, each read comes from the reverse strand (reverse
+    complemented) with probability 0.5, like real sequencing reads.
+    The reads are drawn in NumPy chunks by read_simulator.py, optionally
+    with a sequencing error profile ('none', 'illumina', 'nanopore', ...).
+    """
     samples = []
-    seq_len = len(sequence)
-    
-    for _ in range(num_samples):
-        sample_len = random.randint(min_len, max_len)
-        max_start_index = seq_len - sample_len
-        if max_start_index <= 0:
-            continue
-            
-        start_index = random.randint(0, max_start_index)
-        samples.append(sequence[start_index : start_index + sample_len])
-        
+    for chunk in simulate_reads(sequence, num_samples, min_len, max_len, profile,
+                                both_strands, seed=random.getrandbits(64)):
+        samples.extend(chunk_to_strings(chunk))
     return samples
 
 def rebuild_sequence_greedy(samples, min_overlap):
@@ -80,36 +96,24 @@ def rebuild_sequence_greedy(samples, min_overlap):
     if not samples:
         return ""
 
+    # Index samples by their first and last min_overlap bases (canonical
+    # k-mers, so reads from either strand are found), so each step is a
+    # few lookups of the tail's k-mers instead of a scan of all samples.
+    index = build_end_index(samples, min_overlap)
     rebuilt_sequence = samples[0]
-    used_indices = {0}
+    remove_sample(index, samples, 0, min_overlap)
     
     while True:
-        best_overlap_len = -1
-        best_sample_index = -1
-        
         # This search tail is what we try to match
         search_tail = rebuilt_sequence[-150:] 
         
-        # This is the O(n^2) part:
-        # In each step, we check ALL remaining samples.
-        for i in range(len(samples)):
-            if i in used_indices:
-                continue
-                
-            current_sample = samples[i]
-            
-            # Check for best overlap for this sample
-            for overlap_len in range(min(len(search_tail), len(current_sample)), min_overlap - 1, -1):
-                if search_tail.endswith(current_sample[:overlap_len]):
-                    if overlap_len > best_overlap_len:
-                        best_overlap_len = overlap_len
-                        best_sample_index = i
-                    break 
+        best_sample_index, best_overlap_len, is_reverse = find_best_extension(
+            search_tail, samples, index, min_overlap)
         
         if best_sample_index != -1:
-            best_sample = samples[best_sample_index]
+            best_sample = oriented(samples[best_sample_index], is_reverse)
             rebuilt_sequence += best_sample[best_overlap_len:]
-            used_indices.add(best_sample_index)
+            remove_sample(index, samples, best_sample_index, min_overlap)
         else:
             # Assembly is stuck
             break
@@ -118,27 +122,61 @@ def rebuild_sequence_greedy(samples, min_overlap):
 
 # --- Main Experiment Functions ---
 
-def run_experiment():
+# Our 10 viruses.
+# The sequential experiment uses a *simulated, scaled length* to represent
+# the real genome size, so the script finishes in seconds, not hours.
+# The parallel runner (experiment_runner.py) uses the real lengths.
+# (Name, Real C+G %, Simulated Length in bp, Real Length in bp)
+VIRUS_DATABASE = [
+    ('Human papillomavirus 16 (HPV-16)', 40.7, 1000, 7906),
+    ('HIV-1', 41.8, 1200, 9719),
+    ('Zika virus', 46.2, 1300, 10794),
+    ('Influenza A virus', 41.0, 1500, 13588),
+    ('Ebola virus', 40.9, 2000, 18959),
+    ('SARS-CoV-2', 38.0, 3000, 29903),
+    ('Human alphaherpesvirus 1 (HSV-1)', 68.3, 7500, 152222),
+    ('Bacteriophage T4', 35.4, 8000, 168903),
+    ('Mimivirus', 28.3, 15000, 1181549),
+    ('Pandoravirus salinus', 64.7, 20000, 2473870),
+]
+
+def assemble_samples(samples, assembly_mode="greedy", min_overlap=10):
     """
-    Runs the full assembly simulation for all 10 viruses.
+    Runs one assembler over the samples and returns its contigs (strings,
+    longest first). assembly_mode is "greedy" (rebuild_sequence_greedy),
+    "contigs" (two-way multi-contig greedy), "graph" (greedy layout over
+    FM-index overlaps), "minimizer" (the same layout over overlaps of read
+    pairs that share minimizers), "noisy" (as "minimizer", but overlaps
+    are verified by banded alignment, so reads with errors still overlap)
+    or "dbg" (De Bruijn graph assembler).
+    """
+    if assembly_mode == "dbg":
+        return assemble_de_bruijn(samples)
+    if assembly_mode == "contigs":
+        return [contig['sequence'] for contig in assemble_contigs(samples, min_overlap)]
+    if assembly_mode == "graph":
+        graph = build_overlap_graph(2 * len(samples),
+                                    *find_all_overlaps(samples, min_overlap, both_strands=True))
+        return [rebuild_from_overlap_graph(samples, graph)[0]]
+    if assembly_mode == "minimizer":
+        graph = build_overlap_graph(2 * len(samples), *minimizer_overlaps(samples, min_overlap))
+        return [rebuild_from_overlap_graph(samples, graph)[0]]
+    if assembly_mode == "noisy":
+        overlaps = minimizer_overlaps(samples, min_overlap, verify=make_banded_verifier())
+        graph = build_overlap_graph(2 * len(samples), *overlaps)
+        return [rebuild_from_overlap_graph(samples, graph)[0]]
+    if assembly_mode == "greedy":
+        return [rebuild_sequence_greedy(samples, min_overlap)]
+    raise ValueError(f"Unknown assembly mode '{assembly_mode}'.")
+
+
+def run_experiment(assembly_mode="greedy"):
+    """
+    Runs the full assembly simulation for all 10 viruses, one after the
+    other, at their scaled lengths. See assemble_samples() for the
+    assembly modes. For the multi-contig modes the longest contig is
+    reported.
     """
-    
-    # 1. Define our 10 viruses.
-    # We use a *simulated, scaled length* to represent the real genome size.
-    # This scaling is CRITICAL so the script finishes in seconds, not hours.
-    # (Name, Real C+G %, Simulated Length in base pairs)
-    virus_database = [
-        ('Human papillomavirus 16 (HPV-16)', 40.7, 1000),  # Real: 8kb
-        ('HIV-1', 41.8, 1200),                               # Real: 9.7kb
-        ('Zika virus', 46.2, 1300),                         # Real: 11kb
-        ('Influenza A virus', 41.0, 1500),                  # Real: 13.5kb
-        ('Ebola virus', 40.9, 2000),                        # Real: 19kb
-        ('SARS-CoV-2', 38.0, 3000),                         # Real: 30kb
-        ('Human alphaherpesvirus 1 (HSV-1)', 68.3, 7500), # Real: 152kb
-        ('Bacteriophage T4', 35.4, 8000),                   # Real: 169kb
-        ('Mimivirus', 28.3, 15000),                         # Real: 1.2Mb
-        ('Pandoravirus salinus', 64.7, 20000),              # Real: 2.5Mb
-    ]
     
     # Assembly Parameters
     MIN_SAMPLE_LEN = 100
@@ -152,7 +190,7 @@ def run_experiment():
     
     print("--- Starting Assembly Experiment ---")
     
-    for name, real_cg, sim_length in virus_database:
+    for name, real_cg, sim_length, _ in VIRUS_DATABASE:
         
         # --- A) Generate Genome and Calculate CG ---
         print(f"\nProcessing: {name} (Simulated length: {sim_length} bp)")
@@ -168,7 +206,8 @@ def run_experiment():
         random.shuffle(samples) # Shuffle to simulate random read order
         
         start_time = time.perf_counter()
-        rebuilt_sequence = rebuild_sequence_greedy(samples, MIN_OVERLAP)
+        contigs = assemble_samples(samples, assembly_mode, MIN_OVERLAP)
+        rebuilt_sequence = contigs[0] if contigs else ""
         end_time = time.perf_counter()
         
         time_ms = (end_time - start_time) * 1000
@@ -188,7 +227,10 @@ def run_experiment():
         analysis_lines.append(f"* **C+G Content:** {cg_percent:.2f}%")
         analysis_lines.append(f"* **Samples Generated (8x coverage):** {num_samples}")
         analysis_lines.append(f"* **Assembly Time:** {time_ms:.2f} ms")
-        analysis_lines.append(f"* **Assembly Result:** Rebuilt {len(rebuilt_sequence)} bp before stopping.\n")
+        if assembly_mode in ("dbg", "contigs"):
+            analysis_lines.append(f"* **Assembly Result:** {len(contigs)} contigs, longest {len(rebuilt_sequence)} bp.\n")
+        else:
+            analysis_lines.append(f"* **Assembly Result:** Rebuilt {len(rebuilt_sequence)} bp before stopping.\n")
 
     print("\n--- Experiment Complete ---")
     return plot_data, analysis_lines
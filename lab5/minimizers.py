@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+Minimizer sketches of the reads, used to prefilter overlap candidates.
+
+Every read is reduced to its (w, k)-minimizers: in each window of w
+consecutive k-mers, the k-mer with the smallest hash. Two reads that
+overlap by at least w + k - 1 bases share at least one minimizer, so
+only read pairs sharing minimizers need to be checked. For n reads at
+coverage c this gives about n * c candidate pairs instead of n^2.
+
+K-mers are canonical (the smaller of the k-mer and its reverse
+complement, 2-bit encoded), so reads from both strands are matched, and
+the position of a shared minimizer in both reads gives the diagonal of
+the overlap. Candidates are then verified on that single diagonal, by
+exact comparison or by any other `verify` function (e.g. the banded
+alignment of banded_overlap.py for reads with errors).
+
+minimizer_overlaps() returns overlaps in the same oriented-node form as
+suffix_overlaps.find_all_overlaps(..., both_strands=True), so they feed
+build_overlap_graph() and rebuild_from_overlap_graph() directly.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Byte -> 2-bit base code; 4 marks anything that is not A/C/G/T
+_BASE_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _base in enumerate("ACGT"):
+    _BASE_CODES[ord(_base)] = _code
+    _BASE_CODES[ord(_base.lower())] = _code
+_COMPLEMENT = str.maketrans("ACGTacgt", "TGCAtgca")
+
+_NO_HASH = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+def _reverse_complement(sequence):
+    """Reverse complement of a read."""
+    return sequence.translate(_COMPLEMENT)[::-1]
+
+
+def hash64(values):
+    """Invertible 64-bit mix (MurmurHash3 finalizer), so k-mers are ranked randomly."""
+    values = values ^ (values >> np.uint64(33))
+    values = values * np.uint64(0xFF51AFD7ED558CCD)
+    values = values ^ (values >> np.uint64(33))
+    values = values * np.uint64(0xC4CEB9FE1A85EC53)
+    return values ^ (values >> np.uint64(33))
+
+
+# --- 1. Sketching ---
+
+def read_minimizers(samples, k=15, w=10):
+    """
+    Computes the canonical (w, k)-minimizers of every read.
+    Returns (hashes, reads, positions, is_reverse) arrays, one entry per
+    distinct minimizer occurrence; is_reverse tells whether the read
+    holds the reverse complement of the canonical k-mer.
+    """
+    if not 1 <= k <= 31:
+        raise ValueError("k must be between 1 and 31 for 2-bit uint64 k-mers.")
+    empty = (np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64),
+             np.empty(0, dtype=np.int64), np.empty(0, dtype=bool))
+    lengths = np.fromiter((len(s) for s in samples), dtype=np.int64, count=len(samples))
+    codes = _BASE_CODES[np.frombuffer("".join(samples).encode('ascii'), dtype=np.uint8)]
+    num_kmers = len(codes) - k + 1
+    if num_kmers < w:
+        return empty
+
+    # Rolling 2-bit encoding of every k-mer of the concatenated reads and
+    # of its reverse complement (base j complemented, at bits 2j)
+    codes64 = (codes & 3).astype(np.uint64)
+    complement64 = np.uint64(3) - codes64
+    forward = np.zeros(num_kmers, dtype=np.uint64)
+    backward = np.zeros(num_kmers, dtype=np.uint64)
+    two = np.uint64(2)
+    for j in range(k):
+        forward <<= two
+        forward |= codes64[j:j + num_kmers]
+        backward |= complement64[j:j + num_kmers] << np.uint64(2 * j)
+    is_reverse = backward < forward
+    hashes = hash64(np.minimum(forward, backward))
+
+    # K-mers crossing a read boundary or an unknown base never win a window
+    unknown_before = np.concatenate([[0], np.cumsum(codes > 3)])
+    read_starts = np.cumsum(lengths) - lengths
+    read_of_kmer = np.repeat(np.arange(len(samples)), lengths)[:num_kmers]
+    offset = np.arange(num_kmers) - read_starts[read_of_kmer]
+    valid = (offset <= lengths[read_of_kmer] - k) & (unknown_before[k:] == unknown_before[:num_kmers])
+    hashes[~valid] = _NO_HASH
+
+    # Windows of w k-mers that lie inside one read
+    winners = sliding_window_view(hashes, w).argmin(axis=1) + np.arange(num_kmers - w + 1)
+    window_ok = offset[:num_kmers - w + 1] <= lengths[read_of_kmer[:num_kmers - w + 1]] - k - w + 1
+    # Consecutive windows usually share their minimizer; the winners are
+    # non-decreasing, so duplicates are adjacent
+    winners = winners[window_ok]
+    winners = winners[np.concatenate([[True], winners[1:] != winners[:-1]])]
+    winners = winners[hashes[winners] != _NO_HASH]
+    return hashes[winners], read_of_kmer[winners], offset[winners], is_reverse[winners]
+
+
+# --- 2. Candidate pairs ---
+
+def candidate_pairs(samples, k=15, w=10, max_occurrence=64, min_shared=1):
+    """
+    Finds the read pairs that share minimizers.
+    Minimizers found in more than max_occurrence places (repeats) are
+    ignored. For every pair (a < b) and relative strand, the diagonal
+    supported by the most shared minimizers is kept if it has at least
+    min_shared of them.
+    Returns (a, b, same_strand, diagonal, shared) arrays; the diagonal is
+    where read b (reverse complemented if not same_strand) starts in a.
+    """
+    hashes, reads, positions, is_reverse = read_minimizers(samples, k, w)
+    order = np.argsort(hashes, kind='stable')
+    hashes, reads, positions, is_reverse = hashes[order], reads[order], positions[order], is_reverse[order]
+
+    # Occurrence groups of the same minimizer
+    new_group = np.ones(len(hashes), dtype=bool)
+    new_group[1:] = hashes[1:] != hashes[:-1]
+    group = np.cumsum(new_group) - 1
+    group_start = np.flatnonzero(new_group)
+    group_size = np.diff(np.append(group_start, len(hashes)))
+    rank = np.arange(len(hashes)) - group_start[group]
+    entry_group_size = group_size[group]
+    usable = np.flatnonzero((entry_group_size > 1) & (entry_group_size <= max_occurrence))
+
+    # All pairs inside every group: entry e with entry e + t
+    first, second = [], []
+    t = 1
+    while len(usable):
+        usable = usable[rank[usable] + t < entry_group_size[usable]]
+        first.append(usable)
+        second.append(usable + t)
+        t += 1
+    first = np.concatenate(first) if first else np.empty(0, dtype=np.int64)
+    second = np.concatenate(second) if second else np.empty(0, dtype=np.int64)
+    distinct = reads[first] != reads[second]
+    first, second = first[distinct], second[distinct]
+
+    # Orient every hit as (a < b) and compute its diagonal
+    swap = reads[first] > reads[second]
+    first, second = np.where(swap, second, first), np.where(swap, first, second)
+    a, b = reads[first], reads[second]
+    same = (is_reverse[first] == is_reverse[second]).astype(np.int64)
+    lengths = np.fromiter((len(s) for s in samples), dtype=np.int64, count=len(samples))
+    b_position = np.where(same == 1, positions[second], lengths[b] - positions[second] - k)
+    diagonal = positions[first] - b_position
+
+    # Count hits per (pair, strand, diagonal) with one packed int64 key:
+    # pairs are renumbered first so that the key cannot overflow
+    pairs, pair_index = np.unique(a * len(samples) + b, return_inverse=True)
+    max_len = int(lengths.max())
+    diagonal_bits = (2 * max_len + 1).bit_length()
+    strand_pair = pair_index * 2 + same
+    keys, shared = np.unique((strand_pair << diagonal_bits) | (diagonal + max_len),
+                             return_counts=True)
+
+    # Keep the most supported diagonal of every (pair, strand)
+    strand_pair = keys >> diagonal_bits
+    new_group = np.concatenate([[True], strand_pair[1:] != strand_pair[:-1]])
+    group = np.cumsum(new_group) - 1
+    most = np.maximum.reduceat(shared, np.flatnonzero(new_group))
+    best = np.flatnonzero(shared == most[group])
+    best = best[np.concatenate([[True], group[best][1:] != group[best][:-1]])]
+    best = best[shared[best] >= min_shared]
+
+    pair = pairs[strand_pair[best] >> 1]
+    return (pair // len(samples), pair % len(samples), (strand_pair[best] & 1).astype(bool),
+            (keys[best] & ((1 << diagonal_bits) - 1)) - max_len, shared[best])
+
+
+# --- 3. Verification ---
+
+def exact_overlap(left, right, length):
+    """
+    Matched length of right (= length) if the last `length` bases of left
+    equal the first of right, else 0.
+    """
+    return length if left.endswith(right[:length]) else 0
+
+
+def minimizer_overlaps(samples, min_overlap, k=15, w=10, max_occurrence=64, min_shared=1,
+                       verify=exact_overlap):
+    """
+    Suffix-prefix overlaps of at least min_overlap bases between reads
+    that share minimizers, verified on the diagonal of their shared
+    minimizers with verify(left, right, length), which returns how many
+    bases of right match the last `length` bases of left (0 if none).
+    Nodes are oriented reads: i is read i, i + len(samples) its reverse
+    complement (as with find_all_overlaps(..., both_strands=True)); the
+    length of an edge is the overlapped part of its destination read, and
+    a read contained in another gives an edge whose length is the whole read.
+    Returns (src, dst, length) integer arrays.
+    """
+    n = len(samples)
+    src, dst, length = [], [], []
+
+    def add(x, y, overlap, source_overlap, contained=False):
+        # Edge x -> y and its reverse-complement mirror: rc(y) -> rc(x)
+        # for an overlap (which covers source_overlap bases of rc(x)),
+        # rc(x) -> rc(y) when y lies inside x
+        rc_x, rc_y = (x + n) % (2 * n), (y + n) % (2 * n)
+        src.extend((x, rc_x if contained else rc_y))
+        dst.extend((y, rc_y if contained else rc_x))
+        length.extend((overlap, overlap if contained else source_overlap))
+
+    for a, b, same, d in zip(*(array.tolist() for array in candidate_pairs(
+            samples, k, w, max_occurrence, min_shared)[:4])):
+        read_a = samples[a]
+        read_b = samples[b] if same else _reverse_complement(samples[b])
+        node_b = b if same else b + n
+        len_a, len_b = len(read_a), len(read_b)
+
+        if d >= 0:
+            if d + len_b <= len_a:  # b inside a
+                if verify(read_a[:d + len_b], read_b, len_b):
+                    add(a, node_b, len_b, len_b, contained=True)
+            elif len_a - d >= min_overlap:
+                matched = verify(read_a, read_b, len_a - d)
+                if matched:
+                    add(a, node_b, matched, len_a - d)
+        else:
+            if len_a - d <= len_b:  # a inside b
+                if verify(read_b[:len_a - d], read_a, len_a):
+                    add(node_b, a, len_a, len_a, contained=True)
+            elif len_b + d >= min_overlap:
+                matched = verify(read_b, read_a, len_b + d)
+                if matched:
+                    add(node_b, a, matched, len_b + d)
+
+    return (np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64),
+            np.array(length, dtype=np.int64))
@@ -0,0 +1,253 @@
+# -*- coding: utf-8 -*-
+"""
+Read-end k-mer index used by the greedy assemblers of lab5_1 and lab5_2.
+
+Instead of testing every unused sample against the contig tail, the
+samples are indexed by their first and last k bases (k = min_overlap).
+An overlap of length L between the tail and a sample means the sample
+starts with tail[-L:], so its first k bases are tail[-L:-L+k]. Looking
+those k-mers up for every L gives all extension candidates in
+O(len(tail)) lookups, whatever the number of samples.
+
+Reads come from both strands, so a sample may have to be used as its
+reverse complement. The index is keyed by canonical k-mers (the smaller
+of a k-mer and its reverse complement), so one lookup finds:
+- right extension: samples starting with the k-mer (used as they are)
+  and samples ending with its reverse complement (used reversed);
+- left extension: samples ending with the k-mer and samples starting
+  with its reverse complement.
+Every sample still has exactly two entries (prefix and suffix), so both
+orientations are covered without doubling the index.
+
+assemble_contigs() uses the index to turn a whole read set into contigs
+in one pass.
+"""
+
+from collections import defaultdict
+
+COMPLEMENT = str.maketrans("ACGTNacgtn", "TGCANtgcan")
+
+# An index entry is 2 * sample_index + end
+PREFIX, SUFFIX = 0, 1
+
+
+def reverse_complement(sequence):
+    """Returns the reverse complement of a DNA sequence."""
+    return sequence.translate(COMPLEMENT)[::-1]
+
+
+def canonical(kmer):
+    """Returns the smaller of a k-mer and its reverse complement."""
+    rc = reverse_complement(kmer)
+    return rc if rc < kmer else kmer
+
+
+def oriented(sample, is_reverse):
+    """Returns the sample the way it is laid out in the contig."""
+    return reverse_complement(sample) if is_reverse else sample
+
+
+def build_end_index(samples, k):
+    """
+    Maps the canonical first and last k bases of every sample to index
+    entries (2 * sample_index + PREFIX/SUFFIX). Samples shorter than k are
+    left out (they can never reach the minimum overlap).
+    """
+    index = defaultdict(list)
+    for i, sample in enumerate(samples):
+        if len(sample) >= k:
+            index[canonical(sample[:k])].append(2 * i + PREFIX)
+            index[canonical(sample[-k:])].append(2 * i + SUFFIX)
+    return index
+
+
+def remove_sample(index, samples, sample_index, k):
+    """Removes a used sample from the index so it is never offered again."""
+    sample = samples[sample_index]
+    if len(sample) < k:
+        return
+    for kmer, entry in ((sample[:k], 2 * sample_index + PREFIX),
+                        (sample[-k:], 2 * sample_index + SUFFIX)):
+        bucket = index.get(canonical(kmer))
+        if bucket and entry in bucket:
+            bucket.remove(entry)
+
+
+def _best_candidate(candidates, samples, overlap, rc_overlap, forward_end):
+    """
+    Returns the lowest (sample_index, is_reverse) among the index entries
+    whose oriented sample carries the overlap, or None. forward_end is the
+    end a sample used as it is must match (PREFIX when extending to the
+    right, SUFFIX when extending to the left).
+    """
+    best = None
+    for entry in candidates:
+        i, end = entry >> 1, entry & 1
+        is_reverse = end != forward_end
+        if best is not None and (i, is_reverse) >= best:
+            continue
+        sample = samples[i]
+        if forward_end == PREFIX:
+            matches = sample.endswith(rc_overlap) if is_reverse else sample.startswith(overlap)
+        else:
+            matches = sample.startswith(rc_overlap) if is_reverse else sample.endswith(overlap)
+        if matches:
+            best = (i, is_reverse)
+    return best
+
+
+def find_best_extension(tail, samples, index, min_overlap):
+    """
+    Finds the sample, on either strand, with the longest overlap between
+    the end of `tail` and its start (at least min_overlap bases).
+    Ties are broken by the lowest sample index, forward strand first.
+    Only samples still in the index are considered.
+    Returns (sample_index, overlap_len, is_reverse), or (-1, -1, False)
+    if nothing overlaps.
+    """
+    k = min_overlap
+    tail_len = len(tail)
+    rc_tail = reverse_complement(tail)
+
+    # Longest overlap first: p is where the overlap starts in the tail
+    for p in range(0, tail_len - min_overlap + 1):
+        kmer = tail[p:p + k]
+        rc_kmer = rc_tail[tail_len - p - k:tail_len - p]
+        candidates = index.get(rc_kmer if rc_kmer < kmer else kmer)
+        if not candidates:
+            continue
+
+        best = _best_candidate(candidates, samples, tail[p:], rc_tail[:tail_len - p], PREFIX)
+        if best is not None:
+            return best[0], tail_len - p, best[1]
+
+    return -1, -1, False
+
+
+def find_best_left_extension(head, samples, index, min_overlap):
+    """
+    Finds the sample, on either strand, with the longest overlap between
+    its end and the start of `head` (at least min_overlap bases), lowest
+    index on ties.
+    Returns (sample_index, overlap_len, is_reverse), or (-1, -1, False)
+    if nothing overlaps.
+    """
+    k = min_overlap
+    head_len = len(head)
+    rc_head = reverse_complement(head)
+
+    # Longest overlap first: p is the overlap length
+    for p in range(head_len, min_overlap - 1, -1):
+        kmer = head[p - k:p]
+        rc_kmer = rc_head[head_len - p:head_len - p + k]
+        candidates = index.get(rc_kmer if rc_kmer < kmer else kmer)
+        if not candidates:
+            continue
+
+        best = _best_candidate(candidates, samples, head[:p], rc_head[head_len - p:], SUFFIX)
+        if best is not None:
+            return best[0], p, best[1]
+
+    return -1, -1, False
+
+
+# --- Multi-contig assembly ---
+
+def _find_containing_contig(sample, contigs, contig_index, k, stride):
+    """
+    Returns (contig_id, is_reverse) for an earlier contig that contains the
+    whole sample on either strand, or (-1, False). Contigs are indexed at
+    every stride-th k-mer, so any contained sample of length
+    >= stride + k - 1 shares one of those k-mers.
+    """
+    for is_reverse in (False, True):
+        placed = oriented(sample, is_reverse)
+        for offset in range(min(stride, len(placed) - k + 1)):
+            for contig_id, position in contig_index.get(placed[offset:offset + k], ()):
+                start = position - offset
+                if start >= 0 and contigs[contig_id]['sequence'].startswith(placed, start):
+                    return contig_id, is_reverse
+    return -1, False
+
+
+def assemble_contigs(samples, min_overlap, tail_len=150):
+    """
+    Greedy assembly of a whole read set into contigs.
+    Each contig starts from the first unused sample, is extended to the
+    right and then to the left with the longest overlap at each step,
+    using reads reverse-complemented when that is how they fit, and the
+    next unused sample seeds the next contig. Samples that lie inside an
+    earlier contig (on either strand) are assigned to it instead of
+    seeding a duplicate. Samples shorter than min_overlap cannot overlap
+    anything and are ignored.
+    Returns a list of {'sequence': str, 'reads': [sample indices],
+    'strands': ['+' or '-' per read]}, longest contig first.
+    """
+    k = min_overlap
+    index = build_end_index(samples, k)
+    used = [len(sample) < k for sample in samples]
+
+    lengths = [len(sample) for sample in samples if len(sample) >= k]
+    stride = max(1, min(lengths) - k + 1) if lengths else 1
+    contigs = []
+    contig_index = defaultdict(list)
+
+    def use(sample_index):
+        used[sample_index] = True
+        remove_sample(index, samples, sample_index, k)
+
+    for seed in range(len(samples)):
+        if used[seed]:
+            continue
+
+        contig_id, is_reverse = _find_containing_contig(samples[seed], contigs, contig_index, k, stride)
+        if contig_id != -1:
+            use(seed)
+            contigs[contig_id]['reads'].append(seed)
+            contigs[contig_id]['strands'].append('-' if is_reverse else '+')
+            continue
+
+        use(seed)
+        right_reads = [(seed, '+')]
+
+        # Extend to the right; only the last tail_len bases are searched
+        right_parts = [samples[seed]]
+        tail = samples[seed][-tail_len:]
+        while True:
+            best, overlap_len, is_reverse = find_best_extension(tail, samples, index, min_overlap)
+            if best == -1:
+                break
+            use(best)
+            right_reads.append((best, '-' if is_reverse else '+'))
+            new_part = oriented(samples[best], is_reverse)[overlap_len:]
+            right_parts.append(new_part)
+            tail = (tail + new_part)[-tail_len:]
+
+        # Then to the left, against the first tail_len bases
+        left_parts = []
+        left_reads = []
+        head = "".join(right_parts)[:tail_len]
+        while True:
+            best, overlap_len, is_reverse = find_best_left_extension(head, samples, index, min_overlap)
+            if best == -1:
+                break
+            use(best)
+            left_reads.append((best, '-' if is_reverse else '+'))
+            placed = oriented(samples[best], is_reverse)
+            new_part = placed[:len(placed) - overlap_len]
+            left_parts.append(new_part)
+            head = (new_part + head)[:tail_len]
+
+        sequence = "".join(reversed(left_parts)) + "".join(right_parts)
+        members = left_reads[::-1] + right_reads
+        contig_id = len(contigs)
+        contigs.append({
+            'sequence': sequence,
+            'reads': [read for read, _ in members],
+            'strands': [strand for _, strand in members],
+        })
+        for position in range(0, len(sequence) - k + 1, stride):
+            contig_index[sequence[position:position + k]].append((contig_id, position))
+
+    contigs.sort(key=lambda contig: len(contig['sequence']), reverse=True)
+    return contigs
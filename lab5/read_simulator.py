@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+"""
+Read simulator for the lab5 assemblers, with sequencing errors and
+streaming FASTQ output.
+
+Reads are drawn a chunk at a time: start positions, lengths and strands
+are NumPy arrays, and the bases of the whole chunk are gathered with one
+fancy index into the encoded genome followed by its reverse complement
+(so reverse-strand reads need no extra work). Errors are applied to the flat base
+array of the chunk:
+- substitutions: the base is shifted to one of the three other bases;
+- deletions: the base is dropped;
+- insertions: a random base is added after the base.
+Error rates grow linearly along the read (the profile's "ramp" is the
+rate at the last base divided by the rate at the first), and qualities
+are the Phred value of the local error rate, much lower on the bases that
+were actually changed.
+
+Only one chunk is in memory at a time, so 30x coverage of a 5 Mb genome
+streams to FASTQ in seconds with bounded memory.
+
+Usage: python read_simulator.py genome.fasta out_prefix [coverage] [profile] [paired]
+"""
+
+import sys
+import numpy as np
+
+# Per-base error rates (mean over the read)
+ERROR_PROFILES = {
+    'none': {'substitution': 0.0, 'insertion': 0.0, 'deletion': 0.0, 'ramp': 1.0},
+    'illumina': {'substitution': 0.002, 'insertion': 0.0001, 'deletion': 0.0001, 'ramp': 4.0},
+    'pacbio-hifi': {'substitution': 0.0005, 'insertion': 0.0003, 'deletion': 0.0003, 'ramp': 1.0},
+    'nanopore': {'substitution': 0.03, 'insertion': 0.02, 'deletion': 0.03, 'ramp': 1.0},
+}
+
+# Byte -> base code (A=0, C=1, G=2, T=3, anything else 4) and back
+_BASE_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _base in enumerate("ACGT"):
+    _BASE_CODES[ord(_base)] = _code
+    _BASE_CODES[ord(_base.lower())] = _code
+_BASE_LETTERS = np.frombuffer(b"ACGTN", dtype=np.uint8)
+_COMPLEMENT_CODES = np.array([3, 2, 1, 0, 4], dtype=np.uint8)
+
+MAX_QUALITY = 41
+MIN_QUALITY = 2
+
+
+def encode_genome(genome):
+    """Encodes a DNA string as base codes (0-3, 4 for unknown bases)."""
+    return _BASE_CODES[np.frombuffer(genome.encode('ascii'), dtype=np.uint8)]
+
+
+def get_error_profile(profile):
+    """Returns an error profile given by name or as a dictionary."""
+    if isinstance(profile, dict):
+        return {**ERROR_PROFILES['none'], **profile}
+    try:
+        return ERROR_PROFILES[profile]
+    except KeyError:
+        known = ", ".join(ERROR_PROFILES)
+        raise ValueError(f"Unknown error profile '{profile}'. Known profiles: {known}")
+
+
+# --- 1. Drawing reads ---
+
+def strand_text(genome_codes):
+    """
+    The genome followed by its reverse complement, so that a read from
+    the reverse strand is a plain forward slice of this text.
+    """
+    return np.concatenate([genome_codes, _COMPLEMENT_CODES[genome_codes[::-1]]])
+
+
+def _text_starts(genome_len, starts, lengths, reverse):
+    """Start of each read in the strand text (reverse reads in the second half)."""
+    return np.where(reverse, 2 * genome_len - starts - lengths, starts)
+
+
+def _gather(text, text_starts, lengths):
+    """Gathers the bases of many reads of the strand text into one flat array."""
+    first_base = np.cumsum(lengths) - lengths
+    index = np.repeat(text_starts - first_base, lengths) + np.arange(int(lengths.sum()))
+    return text[index]
+
+
+def _position_tables(profile, max_len):
+    """
+    Error rate and base quality (before noise) for every (read length,
+    position) pair, as tables of shape (max_len + 1, max_len).
+    The rate grows linearly along the read, with the profile's mean.
+    """
+    ramp = profile['ramp']
+    total_rate = profile['substitution'] + profile['insertion'] + profile['deletion']
+    read_len = np.arange(max_len + 1)[:, None]
+    position = np.arange(max_len)[None, :]
+    relative = position / np.maximum(read_len - 1, 1)
+    rate = total_rate * (1 + (ramp - 1) * relative) * (2 / (1 + ramp))
+
+    phred = np.rint(-10 * np.log10(np.maximum(rate, 10 ** (-MAX_QUALITY / 10))))
+    # Noise of -2..+2 is added later, so keep room for it in [MIN, MAX]
+    quality = np.clip(phred, MIN_QUALITY + 2, MAX_QUALITY - 2) - 2
+    return rate.astype(np.float32), quality.astype(np.uint8)
+
+
+def _apply_errors(rng, codes, lengths, profile):
+    """
+    Applies the substitution, insertion and deletion rates of a profile to
+    a flat chunk of reads. Returns (codes, qualities, new_lengths).
+    One uniform draw per base decides whether (and which) error happens;
+    only the few erroneous bases are then processed individually.
+    """
+    total_rate = profile['substitution'] + profile['insertion'] + profile['deletion']
+    if total_rate == 0:
+        qualities = np.full(len(codes), MAX_QUALITY, dtype=np.uint8)
+        return codes, qualities, lengths
+
+    # Flat key of every base in the (read length, position) tables
+    max_len = int(lengths.max())
+    rate_table, quality_table = _position_tables(profile, max_len)
+    ends = np.cumsum(lengths)
+    key = np.repeat(lengths * max_len - (ends - lengths), lengths) + np.arange(len(codes))
+    rate = rate_table.ravel()[key]
+
+    draw = rng.random(len(codes), dtype=np.float32)
+    errors = np.flatnonzero(draw < rate)
+    # Split [0, total_rate) into substitution, deletion and insertion
+    kind = draw[errors] / rate[errors] * total_rate
+    substituted = errors[(kind < profile['substitution']) & (codes[errors] < 4)]
+    deleted = errors[(kind >= profile['substitution']) &
+                     (kind < profile['substitution'] + profile['deletion'])]
+    inserted = errors[kind >= profile['substitution'] + profile['deletion']]
+
+    codes = codes.copy()
+    codes[substituted] = (codes[substituted] +
+                          rng.integers(1, 4, size=len(substituted), dtype=np.uint8)) % 4
+
+    # Phred quality of the local error rate, low where an error was made
+    qualities = quality_table.ravel()[key] + rng.integers(0, 5, size=len(codes), dtype=np.uint8)
+    qualities[substituted] = rng.integers(MIN_QUALITY, 15, size=len(substituted), dtype=np.uint8)
+
+    if len(deleted) == 0 and len(inserted) == 0:
+        return codes, qualities, lengths
+
+    # Drop the deleted bases, then add a random base after every inserted
+    # position (shifted by the deletions before it)
+    codes = np.delete(codes, deleted)
+    qualities = np.delete(qualities, deleted)
+    at = inserted + 1 - np.searchsorted(deleted, inserted, side='right')
+    codes = np.insert(codes, at, rng.integers(0, 4, size=len(inserted), dtype=np.uint8))
+    qualities = np.insert(qualities, at,
+                          rng.integers(MIN_QUALITY, 15, size=len(inserted), dtype=np.uint8))
+
+    deleted_in = np.searchsorted(ends, deleted, side='right')
+    inserted_in = np.searchsorted(ends, inserted, side='right')
+    new_lengths = (lengths - np.bincount(deleted_in, minlength=len(lengths))
+                   + np.bincount(inserted_in, minlength=len(lengths)))
+    return codes, qualities, new_lengths
+
+
+def _make_chunk(rng, text, text_starts, lengths, profile):
+    """Reads of one chunk, as ASCII bases and qualities plus read lengths."""
+    codes = _gather(text, text_starts, lengths)
+    codes, qualities, lengths = _apply_errors(rng, codes, lengths, profile)
+    return {
+        'bases': _BASE_LETTERS[codes],
+        'qualities': qualities + 33,
+        'lengths': lengths,
+    }
+
+
+def simulate_reads(genome, num_reads, min_len=100, max_len=150, profile='none',
+                   both_strands=True, seed=None, chunk_reads=100_000):
+    """
+    Yields chunks of single-end reads drawn uniformly from the genome.
+    Each chunk is a dict with 'bases' and 'qualities' (flat ASCII uint8
+    arrays) and 'lengths' (one entry per read). With both_strands, every
+    read comes from the reverse strand with probability 0.5.
+    """
+    genome_codes = encode_genome(genome) if isinstance(genome, str) else genome
+    profile = get_error_profile(profile)
+    rng = np.random.default_rng(seed)
+    genome_len = len(genome_codes)
+    text = strand_text(genome_codes)
+    max_len = min(max_len, genome_len)
+    if min_len > max_len:
+        return
+
+    for first in range(0, num_reads, chunk_reads):
+        count = min(chunk_reads, num_reads - first)
+        lengths = rng.integers(min_len, max_len + 1, size=count)
+        starts = rng.integers(0, genome_len - lengths + 1)
+        reverse = rng.random(count) < 0.5 if both_strands else np.zeros(count, dtype=bool)
+        yield _make_chunk(rng, text, _text_starts(genome_len, starts, lengths, reverse),
+                          lengths, profile)
+
+
+def simulate_read_pairs(genome, num_pairs, read_len=150, insert_mean=400, insert_sd=40,
+                        profile='none', seed=None, chunk_reads=100_000):
+    """
+    Yields (mate1, mate2) chunks of paired-end reads: both ends of a
+    fragment of normally distributed length, facing each other. Half of
+    the fragments come from the reverse strand (mates swapped).
+    """
+    genome_codes = encode_genome(genome) if isinstance(genome, str) else genome
+    profile = get_error_profile(profile)
+    rng = np.random.default_rng(seed)
+    genome_len = len(genome_codes)
+    text = strand_text(genome_codes)
+    read_len = min(read_len, genome_len)
+
+    for first in range(0, num_pairs, chunk_reads):
+        count = min(chunk_reads, num_pairs - first)
+        fragment = np.rint(rng.normal(insert_mean, insert_sd, size=count)).astype(np.int64)
+        fragment = np.clip(fragment, read_len, genome_len)
+        starts = rng.integers(0, genome_len - fragment + 1)
+        lengths = np.full(count, read_len, dtype=np.int64)
+
+        # Forward fragment: mate 1 = start (+), mate 2 = end (-);
+        # a fragment from the reverse strand has its mates swapped
+        flipped = rng.random(count) < 0.5
+        ends = starts + fragment - read_len
+        mate1 = _text_starts(genome_len, np.where(flipped, ends, starts), lengths, flipped)
+        mate2 = _text_starts(genome_len, np.where(flipped, starts, ends), lengths, ~flipped)
+        yield (_make_chunk(rng, text, mate1, lengths, profile),
+               _make_chunk(rng, text, mate2, lengths, profile))
+
+
+def chunk_to_strings(chunk):
+    """Returns the reads of a chunk as a list of strings."""
+    text = chunk['bases'].tobytes().decode('ascii')
+    ends = np.cumsum(chunk['lengths']).tolist()
+    starts = [0] + ends[:-1]
+    return [text[start:end] for start, end in zip(starts, ends)]
+
+
+# --- 2. FASTQ output ---
+
+def write_fastq_chunk(handle, chunk, first_index, name="read", suffix=""):
+    """Writes one chunk of reads to an open binary FASTQ file."""
+    bases = chunk['bases'].tobytes()
+    qualities = chunk['qualities'].tobytes()
+    ends = np.cumsum(chunk['lengths']).tolist()
+    start = 0
+    records = []
+    for i, end in enumerate(ends, first_index):
+        records.append(b"@%s%d%s\n%s\n+\n%s\n" % (name.encode(), i, suffix.encode(),
+                                                   bases[start:end], qualities[start:end]))
+        start = end
+    handle.write(b"".join(records))
+    return len(ends)
+
+
+def simulate_fastq(genome, out_prefix, coverage=30, min_len=100, max_len=150, profile='illumina',
+                   paired=False, insert_mean=400, insert_sd=40, seed=None, chunk_reads=100_000):
+    """
+    Simulates reads at the given coverage and streams them to FASTQ:
+    out_prefix.fastq, or out_prefix_1.fastq / out_prefix_2.fastq for
+    paired reads (read length max_len). Returns the number of reads written.
+    """
+    genome_codes = encode_genome(genome)
+    if paired:
+        num_pairs = int(len(genome_codes) * coverage / (2 * max_len))
+        written = 0
+        with open(f"{out_prefix}_1.fastq", 'wb') as out1, open(f"{out_prefix}_2.fastq", 'wb') as out2:
+            for mate1, mate2 in simulate_read_pairs(genome_codes, num_pairs, max_len, insert_mean,
+                                                    insert_sd, profile, seed, chunk_reads):
+                write_fastq_chunk(out1, mate1, written, suffix="/1")
+                written += write_fastq_chunk(out2, mate2, written, suffix="/2")
+        return 2 * written
+
+    num_reads = int(len(genome_codes) * coverage / ((min_len + max_len) / 2))
+    written = 0
+    with open(f"{out_prefix}.fastq", 'wb') as out:
+        for chunk in simulate_reads(genome_codes, num_reads, min_len, max_len, profile,
+                                    seed=seed, chunk_reads=chunk_reads):
+            written += write_fastq_chunk(out, chunk, written)
+    return written
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python read_simulator.py genome.fasta out_prefix [coverage] [profile] [paired]")
+        return
+
+    from lab5_1 import parse_fasta
+    genome = parse_fasta(sys.argv[1])
+    if not genome:
+        return
+    coverage = float(sys.argv[3]) if len(sys.argv) > 3 else 30
+    profile = sys.argv[4] if len(sys.argv) > 4 else 'illumina'
+    paired = len(sys.argv) > 5 and sys.argv[5] == "paired"
+
+    written = simulate_fastq(genome, sys.argv[2], coverage, profile=profile, paired=paired)
+    print(f"Wrote {written} reads ({coverage:g}x, profile '{profile}').")
+
+
+if __name__ == "__main__":
+    main()
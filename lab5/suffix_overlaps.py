@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+All-pairs exact suffix-prefix overlaps of a read set, using an FM-index.
+
+The reads are concatenated as  $r0$r1$...$rN$#  and indexed with a
+suffix array and its Burrows-Wheeler transform. Backward-searching a
+read from its last base visits the suffix-array interval of every suffix
+of the read; extending that interval by one more '$' leaves exactly the
+reads that *start* with that suffix. So a single backward pass per read
+reports all of its overlaps, and all reads are searched together with
+NumPy (one vectorized step per base position).
+
+The overlaps are returned as flat arrays (src, dst, length) meaning
+"the last `length` bases of read src equal the first `length` bases of
+read dst". rebuild_from_overlap_graph() lays reads out greedily from
+these precomputed overlaps instead of rescanning the reads at each step.
+
+For reads from both strands, the reverse complement of read i is
+indexed as node i + num_reads, so overlaps between any orientations of
+two reads come out of the same backward search. Unlike the k-mer
+indexes (overlap_index.py, de_bruijn.py), this one cannot be keyed by
+canonical reads: a backward search only finds reads that *start* with a
+query suffix, and two reads that overlap tail to tail (the end of read
+i is the reverse complement of the end of read j) only meet as a prefix
+of the reverse complement of j. That prefix has to be in the text, so
+the text, suffix array and BWT are twice the read volume.
+"""
+
+import numpy as np
+
+# Text alphabet, in sort order: '#' ends the text, '$' separates reads
+TERMINATOR, SEPARATOR = 0, 1
+_TEXT_CODES = np.full(256, 6, dtype=np.uint8)  # 6 = any unknown base
+for _code, _base in enumerate("ACGT", start=2):
+    _TEXT_CODES[ord(_base)] = _code
+    _TEXT_CODES[ord(_base.lower())] = _code
+_TEXT_CODES[ord('$')] = SEPARATOR
+_ALPHABET_SIZE = 7
+_COMPLEMENT = str.maketrans("ACGTacgt", "TGCAtgca")
+
+
+def _reverse_complement(sequence):
+    """Reverse complement of a read."""
+    return sequence.translate(_COMPLEMENT)[::-1]
+
+
+def oriented_read(samples, node):
+    """Sequence of an overlap graph node: read node, or its reverse complement."""
+    num_reads = len(samples)
+    if node < num_reads:
+        return samples[node]
+    return _reverse_complement(samples[node - num_reads])
+
+
+# --- 1. Index construction ---
+
+def build_read_text(samples):
+    """
+    Encodes the reads as one text  $r0$r1$...$rN$#.
+    Returns (text_codes, read_starts, read_lengths).
+    """
+    lengths = np.fromiter((len(s) for s in samples), dtype=np.int64, count=len(samples))
+    joined = "$".join(samples)
+    text = np.empty(len(joined) + 3, dtype=np.uint8)
+    text[0] = SEPARATOR
+    text[1:-2] = _TEXT_CODES[np.frombuffer(joined.encode('ascii'), dtype=np.uint8)]
+    text[-2] = SEPARATOR
+    text[-1] = TERMINATOR
+
+    starts = np.cumsum(lengths + 1) - lengths
+    return text, starts, lengths
+
+
+def suffix_array(text):
+    """
+    Builds the suffix array of an encoded text by prefix doubling.
+    The first 21 characters are packed into one integer (3 bits each) so
+    that the doubling starts at h = 21; reads rarely share more than a
+    few hundred bases, so only a handful of sorting rounds are needed.
+    """
+    n = len(text)
+    pack = 21
+    padded = np.concatenate([text.astype(np.int64), np.zeros(pack, dtype=np.int64)])
+    key = np.zeros(n, dtype=np.int64)
+    for j in range(pack):
+        key = (key << 3) | padded[j:j + n]
+
+    order = np.argsort(key)
+    sorted_key = key[order]
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.concatenate([[0], np.cumsum(sorted_key[1:] != sorted_key[:-1])])
+
+    h = pack
+    while rank.max() < n - 1:
+        # Sort by (rank of the first h characters, rank of the next h)
+        second = np.zeros(n, dtype=np.int64)
+        second[:n - h] = rank[h:] + 1
+        key = rank * (n + 1) + second
+        order = np.argsort(key)
+        sorted_key = key[order]
+        rank[order] = np.concatenate([[0], np.cumsum(sorted_key[1:] != sorted_key[:-1])])
+        h *= 2
+
+    return order
+
+
+def _popcount64(words):
+    """Number of set bits of every uint64 word (SWAR bit counting)."""
+    words = words - ((words >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    words = (words & np.uint64(0x3333333333333333)) + ((words >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    words = (words + (words >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (words * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+class _FMIndex:
+    """
+    Suffix array, BWT and rank structures over the read text.
+    occ(c, i), the number of c in bwt[:i], is answered from one bit vector
+    per character (64 positions per word) plus the running count before
+    each word, i.e. about one byte of memory per text position in total.
+    """
+
+    def __init__(self, text):
+        self.sa = suffix_array(text)
+        bwt = text[self.sa - 1]  # sa - 1 == -1 wraps to the terminator
+        char_counts = np.bincount(text, minlength=_ALPHABET_SIZE)
+        self.first_row = np.concatenate([[0], np.cumsum(char_counts)[:-1]])
+
+        num_words = len(bwt) // 64 + 1
+        self.words = []
+        self.counts_before = []
+        for c in range(_ALPHABET_SIZE):
+            bits = np.packbits(bwt == c, bitorder='little')
+            padded = np.zeros(num_words * 8, dtype=np.uint8)
+            padded[:len(bits)] = bits
+            words = padded.view('<u8')
+            self.words.append(words)
+            self.counts_before.append(
+                np.concatenate([[0], np.cumsum(_popcount64(words))]).astype(np.int64))
+
+    def occ(self, c, positions):
+        """Number of c in bwt[:p] for every p in positions."""
+        word_index = positions >> 6
+        below = (np.uint64(1) << (positions & 63).astype(np.uint64)) - np.uint64(1)
+        in_word = _popcount64(self.words[c][word_index] & below).astype(np.int64)
+        return self.counts_before[c][word_index] + in_word
+
+    def extend(self, chars, lo, hi):
+        """
+        One backward-search step for many patterns at once: prepends
+        chars[i] to pattern i, whose current interval is [lo[i], hi[i]).
+        """
+        new_lo = np.empty_like(lo)
+        new_hi = np.empty_like(hi)
+        for c in range(_ALPHABET_SIZE):
+            mask = chars == c
+            if not mask.any():
+                continue
+            new_lo[mask] = self.first_row[c] + self.occ(c, lo[mask])
+            new_hi[mask] = self.first_row[c] + self.occ(c, hi[mask])
+        return new_lo, new_hi
+
+
+# --- 2. Overlap computation ---
+
+def find_all_overlaps(samples, min_overlap, both_strands=False):
+    """
+    Finds every exact suffix-prefix overlap of at least min_overlap bases
+    between two different reads.
+    With both_strands, the reverse complements are indexed as well (node
+    i + len(samples) is read i reverse complemented) and overlaps between
+    a read and its own reverse complement are left out.
+    Returns (src, dst, length) integer arrays; an overlap equal to the
+    whole length of src means src is contained at the start of dst.
+    """
+    empty = np.empty(0, dtype=np.int64)
+    if len(samples) < 2:
+        return empty, empty, empty
+    num_samples = len(samples)
+    if both_strands:
+        samples = list(samples) + [_reverse_complement(sample) for sample in samples]
+
+    text, starts, lengths = build_read_text(samples)
+    index = _FMIndex(text)
+    num_reads = len(samples)
+
+    # Row r of the '$' block (rows 1..num_reads+1) is a '$' followed by
+    # the read starting right after it (-1 for the final '$' before '#')
+    dollar_rows = index.sa[1:num_reads + 2]
+    dollar_read = np.searchsorted(starts, dollar_rows + 1)
+    dollar_read[dollar_read >= num_reads] = -1
+
+    reads = np.arange(num_reads)
+    lo = np.zeros(num_reads, dtype=np.int64)
+    hi = np.full(num_reads, len(text), dtype=np.int64)
+    ends = starts + lengths - 1  # position of each read's last base
+
+    found_src, found_dst, found_len = [], [], []
+    for step in range(int(lengths.max())):
+        # Reads still being searched: long enough and interval not empty
+        active = (lengths > step) & (hi > lo)
+        if not active.any():
+            break
+        active_reads = reads[active]
+        chars = text[ends[active] - step]
+        lo[active], hi[active] = index.extend(chars, lo[active], hi[active])
+
+        overlap_len = step + 1
+        if overlap_len < min_overlap:
+            continue
+
+        # Extend by '$': rows of reads that start with this read's suffix
+        sep = np.full(len(active_reads), SEPARATOR, dtype=np.uint8)
+        dlo, dhi = index.extend(sep, lo[active], hi[active])
+        num_hits = np.maximum(dhi - dlo, 0)
+        total = int(num_hits.sum())
+        if total == 0:
+            continue
+
+        src = np.repeat(active_reads, num_hits)
+        offsets = np.arange(total) - np.repeat(np.cumsum(num_hits) - num_hits, num_hits)
+        rows = np.repeat(dlo, num_hits) + offsets
+        dst = dollar_read[rows - 1]
+        keep = (dst >= 0) & (dst % num_samples != src % num_samples)
+        found_src.append(src[keep])
+        found_dst.append(dst[keep])
+        found_len.append(np.full(int(keep.sum()), overlap_len, dtype=np.int64))
+
+    if not found_src:
+        return empty, empty, empty
+    return np.concatenate(found_src), np.concatenate(found_dst), np.concatenate(found_len)
+
+
+def build_overlap_graph(num_reads, src, dst, length):
+    """
+    Turns overlap arrays into adjacency lists: graph[i] is the list of
+    (dst, overlap_len) of read i, longest overlap first, keeping only the
+    longest overlap of every (src, dst) pair. Pass 2 * len(samples) as
+    num_reads for overlaps found with both_strands.
+    """
+    graph = [[] for _ in range(num_reads)]
+    if len(src) == 0:
+        return graph
+    order = np.lexsort((dst, -length, src))
+    seen = set()
+    for i, j, ov in zip(src[order].tolist(), dst[order].tolist(), length[order].tolist()):
+        if (i, j) in seen:
+            continue
+        seen.add((i, j))
+        graph[i].append((j, ov))
+    return graph
+
+
+# --- 3. Layout from the precomputed graph ---
+
+def rebuild_from_overlap_graph(samples, graph, seed=0):
+    """
+    Greedy layout over a precomputed overlap graph: starting from the
+    seed read, repeatedly append the unused successor with the longest
+    overlap with the last read that extended the contig. Successors that
+    are contained in that read add nothing and are just marked as used.
+    If the graph has 2 * len(samples) nodes (both strands), each read is
+    used in at most one orientation.
+    Returns (rebuilt_sequence, used_read_count).
+    """
+    if not samples:
+        return "", 0
+
+    num_reads = len(samples)
+    used = [False] * num_reads
+    used[seed % num_reads] = True
+    current = seed
+    rebuilt = [oriented_read(samples, seed)]
+    used_count = 1
+
+    while True:
+        next_read = -1
+        for j, overlap_len in graph[current]:
+            if used[j % num_reads]:
+                continue
+            if overlap_len == len(samples[j % num_reads]):
+                used[j % num_reads] = True  # Contained in the current read
+                used_count += 1
+                continue
+            next_read = j
+            rebuilt.append(oriented_read(samples, j)[overlap_len:])
+            break
+
+        if next_read == -1:
+            break
+        used[next_read % num_reads] = True
+        used_count += 1
+        current = next_read
+
+    return "".join(rebuilt), used_count
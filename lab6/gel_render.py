@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Batched matplotlib renderer for multi-lane gels.
+
+Drawing every band with its own ax.plot call (and every well with its
+own patch) creates one artist per band, so with thousands of bands the
+figure construction dominates the runtime. Here the bands of a whole
+page (ladder included) are one LineCollection built from a NumPy array
+of segments, and the wells are one broken_barh collection. Lanes are
+split into pages of lanes_per_page lanes, each saved as its own image,
+so hundreds of lanes stay readable.
+
+With a migration model (migration.py), bands are placed at the
+distance calibrated on the ladder, fragments that co-migrate merge and
+the band brightness follows its DNA mass.
+
+For very large panels, rasterize_gel() draws all the lanes directly
+into a NumPy image (co-migrating bands add up to brighter bands) and
+save_gel_image() writes it without building a figure at all.
+"""
+
+import os
+
+import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
+import numpy as np
+
+from migration import check_monotonic, gel_bands, migration_distance
+
+LANE_WIDTH = 0.8
+BRIGHT_LADDER_BANDS = (3000, 1000)
+
+
+def band_segments(lanes, positions, lane_width=LANE_WIDTH):
+    """
+    Horizontal band segments of all the lanes: an array of shape
+    (bands, 2, 2) with one ((x0, size), (x1, size)) line per fragment.
+    """
+    counts = [len(fragments) for fragments in lanes]
+    sizes = np.concatenate([np.asarray(f, dtype=float) for f in lanes]) if lanes else np.empty(0)
+    centers = np.repeat(np.asarray(positions, dtype=float), counts)
+    segments = np.empty((len(sizes), 2, 2))
+    segments[:, 0, 0] = centers - lane_width / 2
+    segments[:, 1, 0] = centers + lane_width / 2
+    segments[:, :, 1] = sizes[:, None]
+    return segments
+
+
+def page_paths(filepath, num_pages):
+    """Output file of every page: the file itself, or name_01.png, name_02.png, ..."""
+    if num_pages == 1:
+        return [filepath]
+    root, ext = os.path.splitext(filepath)
+    return [f"{root}_{page + 1:02d}{ext}" for page in range(num_pages)]
+
+
+def _draw_page(lanes, lane_names, ladder_bands, ladder_labels, title, y_range,
+               model=None, resolution_mm=0.5):
+    """Draws one gel page (ladder lane + sample lanes) and returns the figure."""
+    num_lanes = len(lanes)
+    fig, ax = plt.subplots(figsize=(max(8, num_lanes * 1.0 + 2), 8))
+    fig.patch.set_facecolor('black')
+    ax.set_facecolor('black')
+    ax.set_xlim(0, num_lanes + 1)
+    # Ladder at x = 0.5, samples from x = 1.5
+    positions = np.arange(num_lanes + 1) + 0.5
+
+    if model is None:
+        # Bands at their size, on a log axis
+        y_min, y_max = y_range
+        ax.set_ylim(y_min, y_max)
+        ax.set_yscale('log')
+        ax.invert_yaxis()  # Large fragments at top
+        ladder_y, sample_lanes = ladder_bands, lanes
+        sample_alpha = np.ones(sum(len(f) for f in lanes))
+        well_y, label_y = (y_max * 0.95, y_max * 0.1), y_max * 1.1
+        to_y = lambda sizes: sizes
+    else:
+        # Bands at their calibrated migration distance (mm from the well),
+        # co-migrating fragments merged, brightness proportional to mass;
+        # fragments outside y_range run off the gel, as on the log axis
+        bands = gel_bands(lanes, model, resolution_mm, y_range)
+        ladder_y = migration_distance(model, ladder_bands)
+        split = np.searchsorted(bands['lane'], np.arange(1, num_lanes))
+        # np.split always returns one piece, even for a gel without sample lanes
+        sample_lanes = np.split(bands['distance'], split) if num_lanes else []
+        mass = bands['mass']
+        sample_alpha = 0.15 + 0.85 * mass / mass.max() if len(mass) else mass
+        ax.set_ylim(max(ladder_y.max(), bands['distance'].max(initial=0)) + 5, -6)
+        well_y, label_y = (-3, 3), -4
+        to_y = lambda sizes: migration_distance(model, [sizes])[0]
+
+    ladder = band_segments([ladder_y], positions[:1])
+    samples = band_segments(sample_lanes, positions[1:])
+    widths = [4 if size in BRIGHT_LADDER_BANDS else 2 for size in ladder_bands]
+    widths += [3] * len(samples)
+    colors = np.ones((len(ladder) + len(samples), 4))
+    colors[len(ladder):, 3] = sample_alpha
+    ax.add_collection(LineCollection(np.concatenate([ladder, samples]), colors=colors,
+                                     linewidths=widths, capstyle='butt'))
+
+    # Wells, one collection for all the lanes
+    ax.broken_barh([(x - LANE_WIDTH / 2, LANE_WIDTH) for x in positions.tolist()],
+                   well_y, facecolor='#555', edgecolor='#888')
+    ax.text(0.5, label_y, "Ladder", color='white', ha='center', fontsize=9)
+    for x, name in zip(positions[1:].tolist(), lane_names):
+        ax.text(x, label_y, name, color='white', ha='center', fontsize=8, rotation=45, va='bottom')
+
+    for band_size, label_text in ladder_labels.items():
+        ax.text(0.1, to_y(band_size), label_text, color='white', fontsize=10, ha='right', va='center')
+
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+    ax.get_xaxis().set_ticks([])
+    ax.get_yaxis().set_ticks([])
+    if title:
+        ax.set_title(title, color='white', fontsize=16)
+    return fig
+
+
+def render_gel(lanes, lane_names, ladder_bands, ladder_labels, filepath, title=None,
+               lanes_per_page=50, y_range=(50, 10000), dpi=150, model=None, resolution_mm=0.5):
+    """
+    Renders the lanes (lists or arrays of fragment sizes) as a gel, with
+    the ladder on every page. With a migration model (migration.fit_ladder)
+    the bands are placed at their calibrated distance, merged at the gel
+    resolution and shaded by mass; sizes outside y_range run off the gel
+    either way. Returns the list of image files written.
+    """
+    if model is not None:
+        check_monotonic(model, y_range)
+    num_pages = max(1, -(-len(lanes) // lanes_per_page))
+    paths = page_paths(filepath, num_pages)
+    for page, path in enumerate(paths):
+        start = page * lanes_per_page
+        page_title = title if num_pages == 1 or not title else f"{title} ({page + 1}/{num_pages})"
+        fig = _draw_page(lanes[start:start + lanes_per_page], lane_names[start:start + lanes_per_page],
+                         ladder_bands, ladder_labels, page_title, y_range, model, resolution_mm)
+        fig.tight_layout()
+        fig.savefig(path, dpi=dpi)
+        plt.close(fig)
+    return paths
+
+
+# --- Raster gels ---
+
+def rasterize_gel(lanes, y_range=(50, 10000), height=800, lane_px=16, gap_px=4, band_px=3,
+                  model=None):
+    """
+    Draws the lanes into a grayscale image (uint8, large fragments at the
+    top, log scale as on the plotted gels). Every fragment adds one unit
+    of intensity to its rows, scaled so the brightest band is white.
+    With a migration model, rows are calibrated distances from the well
+    and every fragment adds its mass (length) instead.
+    """
+    y_min, y_max = y_range
+    width = len(lanes) * (lane_px + gap_px) + gap_px
+    intensity = np.zeros((height, len(lanes)), dtype=np.float64)
+    counts = [len(fragments) for fragments in lanes]
+    if sum(counts):
+        sizes = np.concatenate([np.asarray(f, dtype=float) for f in lanes])
+        lane = np.repeat(np.arange(len(lanes)), counts)
+        visible = (sizes >= y_min) & (sizes <= y_max)
+        sizes, lane = sizes[visible], lane[visible]
+        if model is None:
+            row = (np.log(y_max) - np.log(sizes)) / (np.log(y_max) - np.log(y_min)) * (height - 1)
+            weight = np.ones(len(sizes))
+        else:
+            check_monotonic(model, y_range)
+            row = migration_distance(model, sizes) / migration_distance(model, [y_min])[0] * (height - 1)
+            weight = sizes
+        row = row.astype(np.int64)
+        for shift in range(band_px):
+            np.add.at(intensity, (np.clip(row + shift - band_px // 2, 0, height - 1), lane), weight)
+
+    # Lane columns -> pixel columns (lanes separated by dark gaps)
+    scale = intensity.max() if intensity.max() > 0 else 1
+    image = np.zeros((height, width), dtype=np.uint8)
+    lane_of_column = (np.arange(width) - gap_px) // (lane_px + gap_px)
+    in_lane = ((np.arange(width) - gap_px) % (lane_px + gap_px) < lane_px) & \
+        (lane_of_column >= 0) & (lane_of_column < len(lanes))
+    columns = np.flatnonzero(in_lane)
+    image[:, columns] = np.minimum(255, intensity[:, lane_of_column[columns]] / scale * 255 * 2)
+    return image
+
+
+def save_gel_image(filepath, image):
+    """Writes a rasterized gel as a grayscale image."""
+    plt.imsave(filepath, image, cmap='gray', vmin=0, vmax=255)
+    return filepath
@@ -9,6 +9,10 @@ import random
 import matplotlib.pyplot as plt
 import numpy as np
 import re
+from matplotlib.collections import LineCollection
+
+from gel_render import band_segments
+from migration import LADDER_1KB_DISTANCES_MM, fit_ladder, gel_bands, migration_distance
 
 # --- Step 1: Parse the FASTA file ---
 # Assumes the file 'covid.fasta' is in the same directory
@@ -68,6 +72,15 @@ ladder_labels = {
     500: '500 bp -'
 }
 
+# --- Calibrate the gel on the ladder ---
+# The bands are placed at their migration distance (mm from the well),
+# read from a curve fitted on the ladder, instead of at log(size)
+model = fit_ladder(ladder_bands, LADDER_1KB_DISTANCES_MM)
+ladder_y = migration_distance(model, ladder_bands)
+# Fragments that co-migrate merge into one band, shaded by its DNA mass
+bands = gel_bands([fragment_lengths], model, resolution_mm=0.5)
+print(f"Ladder fit: RMS error {model['rms_mm']:.2f} mm; {len(bands['mass'])} visible sample bands")
+
 # --- Create the plot ---
 fig, ax = plt.subplots(figsize=(4, 7))
 # Set the background color to black, like a gel box
@@ -76,63 +89,40 @@ ax.set_facecolor('black')
 
 # Set up the plot area
 ax.set_xlim(0, 1)
-# Set Y-axis limits (base pair sizes) with extra space for wells
-ax.set_ylim(50, 12000) 
-# Use a logarithmic scale for the Y-axis, as DNA migrates logarithmically
-ax.set_yscale('log') 
-# Invert the Y-axis so large fragments (slow) are at the top
-ax.invert_yaxis() 
+# Y-axis in mm from the well, downwards, with extra space for the wells
+ax.set_ylim(max(ladder_y.max(), bands['distance'].max(initial=0)) + 5, -6)
 
 # --- Draw the lanes (wells) ---
 lane_width = 0.3
 ladder_x = 0.3 # X-coordinate for the ladder lane
 sample_x = 0.7 # X-coordinate for the sample lane
-well_y_start = 11000 # Y-coordinate for the top of the well
-well_height = 1000  # Height of the well
-
-# Ladder well (a gray box)
-well_patch_ladder = plt.Rectangle((ladder_x - lane_width/2, well_y_start), 
-                                  lane_width, well_height, 
-                                  facecolor='#555555', 
-                                  edgecolor='#888888')
-ax.add_patch(well_patch_ladder)
-
-# Sample well (a gray box)
-well_patch_sample = plt.Rectangle((sample_x - lane_width/2, well_y_start), 
-                                  lane_width, well_height, 
-                                  facecolor='#555555', 
-                                  edgecolor='#888888')
-ax.add_patch(well_patch_sample)
-
-
-# --- Draw Lane 1 (Ladder Bands) ---
-for band_size in ladder_bands:
-    # Make some bands brighter (e.g., 1000 and 3000)
-    lw = 2 # default linewidth
-    if band_size == 3000 or band_size == 1000:
-        lw = 4 # Brighter band (thicker line)
-        
-    # Draw a white line for the band
-    ax.plot([ladder_x - lane_width/2, ladder_x + lane_width/2], 
-            [band_size, band_size], 
-            color='white', 
-            linewidth=lw, 
-            solid_capstyle='butt') # Use square line ends
-
-# --- Draw Lane 2 (Sample Bands) ---
-for frag_len in fragment_lengths:
-    # Draw a white line for each sample fragment
-    ax.plot([sample_x - lane_width/2, sample_x + lane_width/2], 
-            [frag_len, frag_len], 
-            color='white', 
-            linewidth=3, 
-            solid_capstyle='butt')
+well_y_start = -3 # Y-coordinate for the top of the well (mm)
+well_height = 3  # Height of the well (mm)
+
+# Ladder and sample wells (gray boxes), one collection
+ax.broken_barh([(ladder_x - lane_width/2, lane_width), (sample_x - lane_width/2, lane_width)],
+               (well_y_start, well_height),
+               facecolor='#555555',
+               edgecolor='#888888')
+
+
+# --- Draw the bands of both lanes as one LineCollection ---
+# Ladder bands: some are brighter (thicker line), e.g. 1000 and 3000
+ladder_widths = [4 if band_size in (3000, 1000) else 2 for band_size in ladder_bands]
+segments = band_segments([ladder_y, bands['distance']], [ladder_x, sample_x], lane_width)
+# Sample bands: brightness proportional to the DNA mass of the band
+colors = np.ones((len(segments), 4))
+colors[len(ladder_bands):, 3] = 0.15 + 0.85 * bands['mass'] / bands['mass'].max()
+ax.add_collection(LineCollection(segments,
+                                 colors=colors,
+                                 linewidths=ladder_widths + [3] * len(bands['mass']),
+                                 capstyle='butt')) # Use square line ends
 
 # --- Add Labels ---
 for band_size, label_text in ladder_labels.items():
     # Add text to the left of the ladder lane
     ax.text(ladder_x - lane_width/2 - 0.05, # X-position
-            band_size,                     # Y-position (matches band)
+            migration_distance(model, [band_size])[0], # Y-position (matches band)
             label_text,                    # The text itself
             color='white', 
             fontsize=12, 
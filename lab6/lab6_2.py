@@ -5,8 +5,11 @@ Created on Thu Nov  6 14:40:36 2025
 @author: Antonio
 """
 
-import matplotlib.pyplot as plt
-import re
+import sys
+
+from gel_render import render_gel
+from migration import LADDER_1KB_DISTANCES_MM, fit_ladder
+from restriction import DEFAULT_ENZYMES, compile_panel, find_cuts, fragment_lengths, load_enzymes
 
 def parse_multi_fasta(filename):
     """
@@ -62,101 +65,50 @@ def parse_multi_fasta(filename):
     
     return sequences
 
-def restriction_digest(sequence, enzyme_site="GAATTC"):
+def restriction_digest(sequence, panel, circular=False):
     """
-    Performs an in-silico digest on a linear DNA sequence.
-    The default site is EcoRI (GAATTC), which cuts after the 'G'.
+    Performs an in-silico digest on a DNA sequence with a compiled
+    one-enzyme panel (restriction.compile_panel), e.g. EcoRI, which cuts
+    G^AATTC. IUPAC sites, REBASE cut offsets and sites on the reverse
+    strand are handled by restriction.py. A circular sequence (plasmid,
+    circular chromosome) also cuts across the origin, and the fragments
+    on both sides of it are one fragment.
     """
-    # finditer finds all non-overlapping matches
-    # We add +1 because EcoRI cuts after the 'G' at position 1
-    cut_sites = [match.start() + 1 for match in re.finditer(enzyme_site, sequence.upper())]
-    
-    # Add the start and end of the sequence to the list of cut locations
-    all_cuts = [0] + cut_sites + [len(sequence)]
-    
-    # Calculate fragment lengths
-    fragments = []
-    for i in range(1, len(all_cuts)):
-        fragment_len = all_cuts[i] - all_cuts[i-1]
-        if fragment_len > 0:
-            fragments.append(fragment_len)
-            
-    return fragments
+    cuts = find_cuts(sequence, panel, circular)[panel['names'][0]]
+    return fragment_lengths(cuts, len(sequence), circular).tolist()
 
-def plot_multi_gel(lanes_data, lane_names, ladder_bands, ladder_labels):
+def plot_multi_gel(lanes_data, lane_names, ladder_bands, ladder_labels, lanes_per_page=50,
+                   model=None, enzyme_name="EcoRI"):
     """
     Plots a multi-lane gel simulation.
     lanes_data: A list of lists, where each inner list contains fragment sizes.
     lane_names: A list of names for each lane.
+    The bands of every page are drawn as one collection (see gel_render.py),
+    with lanes_per_page lanes per image. With a migration model fitted on
+    the ladder (migration.py), bands sit at their calibrated distance.
     """
-    num_lanes = len(lanes_data)
-    
-    # Create a figure wide enough to accommodate all lanes
-    # Adjust width dynamically based on the number of lanes
-    fig_width = max(8, num_lanes * 1.0 + 2) # +2 for ladder and margins
-    fig, ax = plt.subplots(figsize=(fig_width, 8))
-    fig.patch.set_facecolor('black')
-    ax.set_facecolor('black')
-
-    # Set up the plot area
-    ax.set_xlim(0, num_lanes + 1)
-    ax.set_ylim(50, 10000)  # Standard range, log scale
-    ax.set_yscale('log')
-    ax.invert_yaxis()  # Large fragments at top
-
-    # --- Draw Lane 1 (Ladder) ---
-    lane_x = 0.5
-    lane_width = 0.8
-    # Draw well
-    ax.add_patch(plt.Rectangle((lane_x - lane_width/2, 9500), lane_width, 1000, 
-                               facecolor='#555', edgecolor='#888'))
-    ax.text(lane_x, 11000, "Ladder", color='white', ha='center', fontsize=9)
-    
-    # Draw ladder bands
-    for band_size in ladder_bands:
-        lw = 2
-        if band_size == 3000 or band_size == 1000:
-            lw = 4  # Brighter band
-        ax.plot([lane_x - lane_width/2, lane_x + lane_width/2], 
-                [band_size, band_size], color='white', linewidth=lw, solid_capstyle='butt')
-
-    # --- Draw Sample Lanes ---
-    for i, (fragments, name) in enumerate(zip(lanes_data, lane_names)):
-        lane_x = i + 1.5  # Position each sample lane (starting from 1.5)
-        # Draw well
-        ax.add_patch(plt.Rectangle((lane_x - lane_width/2, 9500), lane_width, 1000, 
-                                   facecolor='#555', edgecolor='#888'))
-        # Draw lane name (rotated for clarity)
-        ax.text(lane_x, 11000, name, color='white', ha='center', fontsize=8, rotation=45, va='bottom')
-        
-        # Draw fragment bands
-        for frag_len in fragments:
-            ax.plot([lane_x - lane_width/2, lane_x + lane_width/2], 
-                    [frag_len, frag_len], color='white', linewidth=3, solid_capstyle='butt')
-
-    # --- Add Labels ---
-    for band_size, label_text in ladder_labels.items():
-        # Position labels to the left of the ladder
-        ax.text(0.1, band_size, label_text, color='white', fontsize=10, ha='right', va='center')
-
-    # --- Clean up axes ---
-    ax.spines['top'].set_visible(False)
-    ax.spines['right'].set_visible(False)
-    ax.spines['bottom'].set_visible(False)
-    ax.spines['left'].set_visible(False)
-    ax.get_xaxis().set_ticks([])
-    ax.get_yaxis().set_ticks([])
-    ax.set_title("Simulated EcoRI Restriction Digest", color='white', fontsize=16)
-
-    plt.tight_layout()
-    plt.savefig('multi_gel_simulation.png', dpi=150)
-    print(f"\nSuccessfully generated image: multi_gel_simulation.png")
+    paths = render_gel(lanes_data, lane_names, ladder_bands, ladder_labels,
+                       'multi_gel_simulation.png', title=f"Simulated {enzyme_name} Restriction Digest",
+                       lanes_per_page=lanes_per_page, model=model)
+    for path in paths:
+        print(f"\nSuccessfully generated image: {path}")
 
 # --- Main script execution ---
 def main():
     # 1. DEFINE FILES AND PARAMETERS
     fasta_file = "sequences.fasta"
-    enzyme_site = "GAATTC"  # EcoRI
+
+    # Usage: python lab6_2.py [enzyme_library] [enzyme_name] [--circular]
+    args = [arg for arg in sys.argv[1:] if arg != "--circular"]
+    circular = "--circular" in sys.argv
+    # Optional enzyme library file (see lab9/enzymes.txt), else the default panel
+    enzymes = load_enzymes(args[0]) if args else DEFAULT_ENZYMES
+    enzyme_name = args[1] if len(args) > 1 else "EcoRI"
+    enzyme = [e for e in enzymes if e[0] == enzyme_name]
+    if not enzyme:
+        print(f"Error: enzyme '{enzyme_name}' not found in the library.")
+        return
+    panel = compile_panel(enzyme)
     
     # Define the DNA ladder (based on a common 1kb ladder)
     ladder_bands = [10000, 8000, 6000, 5000, 4000, 3000, 2500, 2000, 1500, 1000, 750, 500, 250, 100]
@@ -177,10 +129,12 @@ def main():
     digest_results = {}
     
     print(f"Found {len(sequences)} sequences. Starting in-silico restriction digest...")
+    if circular:
+        print("Circular genomes: the fragments across the origin are joined.")
     
     for name, seq in sequences.items():
         print(f"  Digesting {name} (Length: {len(seq)} bp)...")
-        fragments = restriction_digest(seq, enzyme_site)
+        fragments = restriction_digest(seq, panel, circular)
         
         # Store results for plotting and analysis
         all_fragments.append(fragments)
@@ -208,7 +162,11 @@ def main():
     print("------------------------")
 
     # 4. PLOT THE GEL
-    plot_multi_gel(all_fragments, lane_names, ladder_bands, ladder_labels)
+    # Migration calibrated on the ladder (example distances of a 1 kb ladder run)
+    model = fit_ladder(ladder_bands, LADDER_1KB_DISTANCES_MM)
+    print(f"Ladder fit: RMS error {model['rms_mm']:.2f} mm")
+    plot_multi_gel(all_fragments, lane_names, ladder_bands, ladder_labels, model=model,
+                   enzyme_name=enzyme_name)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
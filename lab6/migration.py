@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Calibrated migration model for simulated gels.
+
+On a real gel the migration distance is not exactly linear in log(size):
+large fragments are compressed near the well. The model is fitted on
+the ladder: a low-degree polynomial of the distance against log10(size),
+inverted on a dense grid to read sizes back from distances. All the
+fragments of all the lanes are then mapped at once with np.polyval.
+Outside the ladder range a polynomial folds back (a 22 bp fragment
+would land above the 100 bp band), so there the curve is extended
+linearly from its slope at the end of the ladder, which keeps the
+distance monotonic in the size at any size.
+
+Fragments that migrate closer than the gel resolution merge into one
+band; the intensity of a band is proportional to the DNA mass in it
+(the sum of the fragment lengths, since the fragments of a digest are
+equimolar).
+"""
+
+import numpy as np
+
+# 1 kb ladder and example migration distances (mm from the well), used
+# when no measured ladder is given: a reciprocal size-mobility curve,
+# distance = 5 + 48000 / (size + 700)
+LADDER_1KB = [10000, 8000, 6000, 5000, 4000, 3000, 2500, 2000, 1500, 1000, 750, 500, 250, 100]
+LADDER_1KB_DISTANCES_MM = [9.5, 10.5, 12.2, 13.4, 15.2, 18.0, 20.0, 22.8, 26.8, 33.2, 38.1, 45.0, 55.5, 65.0]
+
+
+def fit_ladder(ladder_sizes=LADDER_1KB, ladder_distances=LADDER_1KB_DISTANCES_MM, degree=3):
+    """
+    Fits the migration model on the ladder bands.
+    Returns a dict with the polynomial coefficients of distance vs
+    log10(size) ('distance'), a (distance, log10 size) grid of the fitted
+    curve over the ladder range to invert it ('grid'), the slopes of the
+    curve at the largest and smallest ladder band ('end_slopes', used to
+    extend it) and the fit residual (RMS, in mm).
+    """
+    log_sizes = np.log10(np.asarray(ladder_sizes, dtype=float))
+    distances = np.asarray(ladder_distances, dtype=float)
+    if len(log_sizes) != len(distances) or len(log_sizes) <= degree:
+        raise ValueError(f"The ladder needs more than {degree} bands with one distance each.")
+    distance_fit = np.polyfit(log_sizes, distances, degree)
+    residual = distances - np.polyval(distance_fit, log_sizes)
+    # Large fragments migrate less: the distance grows as log10(size) falls
+    grid_log_sizes = np.linspace(log_sizes.max(), log_sizes.min(), 2048)
+    grid_distances = np.polyval(distance_fit, grid_log_sizes)
+    end_slopes = np.polyval(np.polyder(distance_fit), grid_log_sizes[[0, -1]])
+    if np.any(np.diff(grid_distances) <= 0) or np.any(end_slopes >= 0):
+        raise ValueError("The fitted migration curve is not monotonic; use a lower degree.")
+    return {
+        'distance': distance_fit,
+        'grid': (grid_distances, grid_log_sizes),
+        'end_slopes': end_slopes,
+        'rms_mm': float(np.sqrt(np.mean(residual ** 2))),
+    }
+
+
+def migration_distance(model, sizes):
+    """
+    Migration distance (mm) of every fragment size; linear in log10(size)
+    beyond the ladder range.
+    """
+    grid_log_sizes = model['grid'][1]
+    largest, smallest = grid_log_sizes[0], grid_log_sizes[-1]
+    log_sizes = np.log10(np.asarray(sizes, dtype=float))
+    inside = np.clip(log_sizes, smallest, largest)
+    slopes = np.where(log_sizes > largest, *model['end_slopes'])
+    return np.polyval(model['distance'], inside) + slopes * (log_sizes - inside)
+
+
+def estimate_size(model, distances):
+    """Fragment size (bp) read back from migration distances."""
+    grid_distances, grid_log_sizes = model['grid']
+    distances = np.asarray(distances, dtype=float)
+    inside = np.clip(distances, grid_distances[0], grid_distances[-1])
+    slopes = np.where(distances < grid_distances[0], *model['end_slopes'])
+    log_sizes = np.interp(inside, grid_distances, grid_log_sizes) + (distances - inside) / slopes
+    return 10 ** log_sizes
+
+
+def check_monotonic(model, size_range, samples=1024):
+    """Raises ValueError unless larger sizes migrate less over the whole size range."""
+    sizes = np.geomspace(size_range[0], size_range[1], samples)
+    if np.any(np.diff(migration_distance(model, sizes)) >= 0):
+        raise ValueError(f"The migration model is not monotonic between {size_range[0]} "
+                         f"and {size_range[1]} bp.")
+
+
+def gel_bands(lanes, model, resolution_mm=0.5, size_range=None):
+    """
+    Visible bands of every lane: the fragments of a lane that migrate
+    less than resolution_mm apart merge into one band. With a size_range
+    (min, max bp), the fragments outside it (off the gel) are dropped.
+    Returns a dict of arrays, one entry per band: 'lane', 'distance'
+    (mass-weighted), 'size' (read back from the distance), 'count' and
+    'mass' (bp of DNA in the band, proportional to its intensity).
+    """
+    counts = [len(fragments) for fragments in lanes]
+    sizes = np.concatenate([np.asarray(f, dtype=float) for f in lanes]) if sum(counts) else np.empty(0)
+    lane = np.repeat(np.arange(len(lanes)), counts)
+    if size_range is not None:
+        visible = (sizes >= size_range[0]) & (sizes <= size_range[1])
+        sizes, lane = sizes[visible], lane[visible]
+    distance = migration_distance(model, sizes)
+
+    order = np.lexsort((distance, lane))
+    lane, distance, sizes = lane[order], distance[order], sizes[order]
+    new_band = np.ones(len(sizes), dtype=bool)
+    new_band[1:] = (lane[1:] != lane[:-1]) | (np.diff(distance) > resolution_mm)
+    band = np.cumsum(new_band) - 1
+    num_bands = int(new_band.sum())
+
+    mass = np.bincount(band, weights=sizes, minlength=num_bands)
+    band_distance = np.bincount(band, weights=distance * sizes, minlength=num_bands) / np.maximum(mass, 1)
+    return {
+        'lane': lane[new_band],
+        'distance': band_distance,
+        'size': estimate_size(model, band_distance),
+        'count': np.bincount(band, minlength=num_bands),
+        'mass': mass,
+    }
@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""
+Single-pass restriction digest of a sequence with a whole enzyme panel.
+
+The lab9 scripts searched every enzyme separately with `str.find`, so the
+sequence was rescanned once per enzyme. Here the panel is compiled once:
+every recognition site is 2-bit encoded and all the sites of the same
+length go into one sorted table. The sequence is encoded once, the
+rolling code of every window of that length is computed with NumPy and
+looked up in the table with a binary search, which finds the sites of
+all the enzymes in one pass. The cost depends on the number of distinct
+site lengths (usually 4 to 8), not on the number of enzymes.
+
+Sites may use IUPAC codes. N positions become "don't care" bits of the
+table (the window code is masked before the lookup), the other
+degenerate codes (R, Y, W, ...) are expanded into every concrete site.
+Cuts are given on both strands, as in REBASE: "G^AATTC" cuts the top
+strand after the G (and the bottom strand symmetrically), "GAAGA(8/7)"
+cuts 8 bases after the site on the top strand and 7 on the bottom one.
+Non-palindromic sites are also searched on the reverse strand.
+
+find_cuts() returns the top-strand cut positions of every enzyme as a
+sorted NumPy array; fragment_lengths() turns them into fragment sizes.
+Both take circular=True for plasmids and circular chromosomes: only the
+first (longest site - 1) bases are appended to the scan to find the
+sites spanning the origin, and the fragments on both sides of the
+origin are one fragment.
+"""
+
+import itertools
+import re
+
+import numpy as np
+
+# (name, site, top-strand cut offset from the start of the site)
+DEFAULT_ENZYMES = [
+    ("EcoRI", "GAATTC", 1),
+    ("BamHI", "GGATCC", 1),
+    ("HindIII", "AAGCTT", 1),
+    ("TaqI", "TCGA", 1),
+    ("HaeIII", "GGCC", 2),
+]
+
+# Byte -> 2-bit base code; 4 marks anything that is not A/C/G/T
+_BASE_CODES = np.full(256, 4, dtype=np.uint8)
+for _code, _base in enumerate("ACGT"):
+    _BASE_CODES[ord(_base)] = _code
+    _BASE_CODES[ord(_base.lower())] = _code
+
+IUPAC_CODES = {
+    'A': "A", 'C': "C", 'G': "G", 'T': "T",
+    'R': "AG", 'Y': "CT", 'S': "CG", 'W': "AT", 'K': "GT", 'M': "AC",
+    'B': "CGT", 'D': "AGT", 'H': "ACT", 'V': "ACG", 'N': "ACGT",
+}
+_IUPAC_COMPLEMENT = str.maketrans("ACGTRYSWKMBDHVN", "TGCAYRSWMKVHDBN")
+
+MAX_SITE_LEN = 32  # 2-bit codes of a site must fit in a uint64
+MAX_EXPANSIONS = 4096  # Concrete sites of one degenerate site (N excluded)
+
+_CUT_SPEC = re.compile(r"^([A-Za-z]+)\((-?\d+)/(-?\d+)\)$")
+
+
+def encode_sequence(sequence):
+    """Encodes a DNA string as uint8 base codes (A=0, C=1, G=2, T=3, other=4)."""
+    return _BASE_CODES[np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)]
+
+
+def reverse_complement_site(site):
+    """Reverse complement of a site written with IUPAC codes."""
+    return site.upper().translate(_IUPAC_COMPLEMENT)[::-1]
+
+
+# --- 1. Enzymes and the compiled panel ---
+
+def parse_site(spec):
+    """
+    Parses a REBASE-style site: "G^AATTC" (cut at the caret, the bottom
+    strand cut at the mirror position) or "GAAGA(8/7)" (cuts after the
+    end of the site on the top/bottom strand).
+    Returns (site, top_cut, bottom_cut), offsets from the start of the
+    site; the bottom cut is counted along the top strand.
+    """
+    spec = spec.strip()
+    match = _CUT_SPEC.match(spec)
+    if match:
+        site = match.group(1).upper()
+        return site, len(site) + int(match.group(2)), len(site) + int(match.group(3))
+    if spec.count('^') != 1:
+        raise ValueError(f"Site '{spec}' needs one '^' or a (top/bottom) cut suffix.")
+    top = spec.index('^')
+    site = spec.replace('^', '').upper()
+    return site, top, len(site) - top
+
+
+def load_enzymes(filepath):
+    """
+    Reads an enzyme library: one "name site" per line (site as in
+    parse_site), '#' starts a comment.
+    Returns (name, site, top_cut, bottom_cut) tuples.
+    """
+    enzymes = []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#')[0].strip()
+            if not line:
+                continue
+            name, spec = line.split()
+            enzymes.append((name,) + parse_site(spec))
+    return enzymes
+
+
+def read_fasta(filename):
+    """Headers and sequences of a multi-FASTA file."""
+    headers, sequences = [], []
+    with open(filename, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(">"):
+                headers.append(line[1:])
+                sequences.append([])
+            elif sequences:
+                sequences[-1].append(line)
+    return headers, ["".join(parts) for parts in sequences]
+
+
+def _site_patterns(site):
+    """
+    Expands an IUPAC site into (care_mask, code) pairs: the care mask
+    keeps the bits of the non-N positions, the codes are every concrete
+    choice of the other degenerate positions.
+    """
+    care, choices = 0, []
+    for base in site:
+        if base not in IUPAC_CODES:
+            raise ValueError(f"Recognition site '{site}' contains the unknown base '{base}'.")
+        care <<= 2
+        if base == 'N':
+            choices.append((0,))
+        else:
+            care |= 3
+            choices.append(tuple(encode_sequence(IUPAC_CODES[base]).tolist()))
+    num_sites = int(np.prod([len(c) for c in choices]))
+    if num_sites > MAX_EXPANSIONS:
+        raise ValueError(f"Recognition site '{site}' expands to {num_sites} sites "
+                         f"(more than {MAX_EXPANSIONS}).")
+    codes = []
+    for combination in itertools.product(*choices):
+        code = 0
+        for value in combination:
+            code = (code << 2) | value
+        codes.append(code)
+    return care, codes
+
+
+def compile_panel(enzymes=DEFAULT_ENZYMES):
+    """
+    Compiles a list of (name, site, top_cut) or (name, site, top_cut,
+    bottom_cut) enzymes (without bottom_cut, the cut is symmetric, as for
+    a palindromic site). The result holds one table per (site length,
+    care mask) with the sorted site codes and, for each code, the
+    (enzyme index, cut offset in the window) patterns it stands for (as
+    CSR arrays, so isoschizomers sharing a site are found together).
+    """
+    names = [enzyme[0] for enzyme in enzymes]
+    if len(set(names)) != len(names):
+        raise ValueError("Enzyme names in a panel must be unique.")
+
+    patterns_by_key = {}
+    for enzyme_index, (name, site, top, *bottom) in enumerate(enzymes):
+        site = site.upper()
+        if not 1 <= len(site) <= MAX_SITE_LEN:
+            raise ValueError(f"Site of {name} must be 1 to {MAX_SITE_LEN} bases long.")
+        bottom = bottom[0] if bottom else len(site) - top
+
+        # The site on the top strand, then on the bottom strand (read on
+        # the top strand as its reverse complement, where the enzyme's
+        # bottom-strand cut falls on our top strand)
+        strands = [(site, top)]
+        reverse_site, reverse_cut = reverse_complement_site(site), len(site) - bottom
+        if (reverse_site, reverse_cut) != (site, top):
+            strands.append((reverse_site, reverse_cut))
+        for strand_site, cut in strands:
+            care, codes = _site_patterns(strand_site)
+            patterns = patterns_by_key.setdefault((len(site), care), [])
+            patterns.extend((code, enzyme_index, cut) for code in codes)
+
+    tables = {}
+    for (length, care), patterns in patterns_by_key.items():
+        patterns.sort()
+        codes = np.array([code for code, _, _ in patterns], dtype=np.uint64)
+        unique_codes, starts = np.unique(codes, return_index=True)
+        tables.setdefault(length, []).append({
+            'care': np.uint64(care),
+            'codes': unique_codes,
+            'starts': np.append(starts, len(patterns)),
+            'enzyme': np.array([e for _, e, _ in patterns], dtype=np.int64),
+            'offset': np.array([o for _, _, o in patterns], dtype=np.int64),
+        })
+    return {'names': names, 'tables': tables}
+
+
+# --- 2. Scanning ---
+
+def window_codes(codes, length):
+    """
+    Rolling 2-bit code of every window of `length` bases, and whether the
+    window contains only A/C/G/T.
+    """
+    num_windows = len(codes) - length + 1
+    if num_windows <= 0:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=bool)
+    values = (codes & 3).astype(np.uint64)
+    rolling = np.zeros(num_windows, dtype=np.uint64)
+    two = np.uint64(2)
+    for j in range(length):
+        rolling <<= two
+        rolling |= values[j:j + num_windows]
+    unknown_before = np.concatenate([[0], np.cumsum(codes > 3)])
+    valid = unknown_before[length:] == unknown_before[:num_windows]
+    return rolling, valid
+
+
+def find_cuts(sequence, panel, circular=False):
+    """
+    Finds the sites of every enzyme of a compiled panel on both strands of
+    the sequence (a string or encoded codes) and returns {name: sorted
+    top-strand cut positions}, each an int64 NumPy array (empty if the
+    enzyme does not cut). A circular sequence can be cut at any position
+    0 <= cut < len; a linear one only strictly inside.
+    """
+    codes = encode_sequence(sequence) if isinstance(sequence, str) else sequence
+    seq_len = len(codes)
+    if circular and seq_len:
+        # Sites spanning the origin: append the first (longest site - 1)
+        # bases (repeated if the sequence is even shorter than that)
+        wrap = max(panel['tables'], default=1) - 1
+        codes = codes[np.arange(seq_len + wrap) % seq_len] if wrap > seq_len else \
+            np.concatenate([codes, codes[:wrap]])
+    hit_enzymes, hit_cuts = [], []
+
+    for length, length_tables in panel['tables'].items():
+        # A circular scan starts one window at every position of the sequence
+        rolling, valid = window_codes(codes[:seq_len + length - 1] if circular else codes, length)
+        for table in length_tables:
+            masked = rolling & table['care']
+            slot = np.searchsorted(table['codes'], masked)
+            slot[slot == len(table['codes'])] = 0
+            positions = np.flatnonzero(valid & (table['codes'][slot] == masked))
+            if len(positions) == 0:
+                continue
+
+            # Every matching window yields one hit per pattern of its code
+            first, last = table['starts'][slot[positions]], table['starts'][slot[positions] + 1]
+            counts = last - first
+            pattern = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+            hit_enzymes.append(table['enzyme'][pattern])
+            hit_cuts.append(np.repeat(positions, counts) + table['offset'][pattern])
+
+    names = panel['names']
+    enzymes = np.concatenate(hit_enzymes) if hit_enzymes else np.empty(0, dtype=np.int64)
+    cuts = np.concatenate(hit_cuts) if hit_cuts else np.empty(0, dtype=np.int64)
+    if circular:
+        cuts = cuts % max(seq_len, 1)
+        inside = np.ones(len(cuts), dtype=bool)
+    else:
+        # Cuts outside the sequence (sites near the ends) do not cut it
+        inside = (cuts > 0) & (cuts < seq_len)
+    # Sort and deduplicate (enzyme, cut) with one packed key, then split
+    # into one array per enzyme
+    keys = enzymes[inside] * seq_len + cuts[inside]
+    keys.sort()
+    keys = keys[np.concatenate([[True], keys[1:] != keys[:-1]])] if len(keys) else keys
+    enzymes, cuts = keys // max(seq_len, 1), keys % max(seq_len, 1)
+    bounds = np.searchsorted(enzymes, np.arange(len(names) + 1))
+    return {name: cuts[bounds[i]:bounds[i + 1]] for i, name in enumerate(names)}
+
+
+def fragment_lengths(cuts, seq_len, circular=False):
+    """
+    Lengths of the fragments of a sequence cut at the sorted positions.
+    On a circular sequence the fragment across the origin is one fragment
+    (and a single cut only linearizes it).
+    """
+    if not circular:
+        return np.diff(np.concatenate([[0], cuts, [seq_len]]))
+    if len(cuts) == 0:
+        return np.array([seq_len])
+    return np.append(np.diff(cuts), seq_len - cuts[-1] + cuts[0])
@@ -7,7 +7,8 @@ Created on Thu Nov 13 14:01:28 2025
 
 import sys
 import os
-from collections import defaultdict
+
+import tandem_repeats
 
 def extract_sequence(fasta_file):
     """
@@ -44,53 +45,12 @@ def find_tandem_repeats(sequence, min_len=3, max_len=6):
     Detects tandem repetitions (consecutive identical motifs) 
     in the DNA sequence for motif lengths between min_len (3) and max_len (6).
     The minimum number of repetitions is 2.
+    Returns {motif_length: {motif: [(start_index, repeat_count)]}}, with
+    every start position of a repeat (see tandem_repeats.py).
     """
-    # A dictionary to store results: {motif_length: {motif: [list_of_locations]}}
-    # Each list_of_locations holds tuples: (start_index, repeat_count)
-    all_repeats = defaultdict(lambda: defaultdict(list))
-    
-    if not sequence:
-        return all_repeats
-
-    seq_len = len(sequence)
-    print(f"\nSequence length: {seq_len} nucleotides.")
-    
-    # Iterate through all required motif lengths (3, 4, 5, 6)
-    for k in range(min_len, max_len + 1):
-        # Slide a window of size k across the sequence
-        for i in range(seq_len - k + 1):
-            # The current k-mer (motif)
-            motif = sequence[i:i + k]
-            
-            # The expected location of the second repeat immediately following the first
-            next_start_index = i + k
-            
-            # Check if there's enough sequence left for at least one more repetition (min 2 copies)
-            if next_start_index + k <= seq_len:
-                next_motif = sequence[next_start_index:next_start_index + k]
-                
-                # Check for a repetition (a tandem repeat of length k)
-                if motif == next_motif:
-                    # Found a repeat! Check for a longer run of this same motif
-                    repeat_count = 2 # Start with 2 copies (motif + next_motif)
-                    current_end = next_start_index + k
-                    
-                    # Continue checking for additional consecutive repeats
-                    while current_end + k <= seq_len and sequence[current_end:current_end + k] == motif:
-                        repeat_count += 1
-                        current_end += k
-                    
-                    # Store the repeat if it hasn't been stored yet
-                    # We only store the *first* occurrence of a contiguous block
-                    start_index = i
-                    
-                    # Accesses the start_index (the int) of the last stored repeat run
-                    if not all_repeats[k][motif] or start_index > all_repeats[k][motif][-1][0]:
-                        
-                        # Add the start index and the count of repeats
-                        all_repeats[k][motif].append((start_index, repeat_count))
-    
-    return all_repeats
+    if sequence:
+        print(f"\nSequence length: {len(sequence)} nucleotides.")
+    return tandem_repeats.find_tandem_repeats(sequence, min_len, max_len)
 
 def print_results(results):
     """
@@ -7,11 +7,12 @@ Created on Thu Nov 13 15:23:18 2025
 
 import pandas as pd
 import matplotlib.pyplot as plt
-from collections import defaultdict
 import textwrap
 import os
 import sys
 
+import tandem_repeats
+
 # --- 1. FASTA File Handling ---
 
 def read_multi_fasta(fasta_file):
@@ -56,44 +57,11 @@ def find_tandem_repeats(sequence, min_len=3, max_len=6):
     """
     Detects tandem repetitions (consecutive identical motifs) 
     in the DNA sequence for motif lengths between 3 and 6 bases (inclusive).
+    A start inside the last stored run of the same motif is skipped, so
+    only the full, longest contiguous runs are stored (see tandem_repeats.py).
     Returns: {k: {motif: [(start_index, repeat_count)]}}
     """
-    all_repeats = defaultdict(lambda: defaultdict(list))
-    if not sequence:
-        return all_repeats
-
-    seq_len = len(sequence)
-    
-    # Iterate through motif lengths k = 3, 4, 5, 6
-    for k in range(min_len, max_len + 1):
-        # Slide a window of size k across the sequence
-        for i in range(seq_len - k + 1):
-            motif = sequence[i:i + k]
-            next_start_index = i + k
-            
-            # Check for at least 2 copies (the motif + the next_motif)
-            if next_start_index + k <= seq_len:
-                next_motif = sequence[next_start_index:next_start_index + k]
-                
-                if motif == next_motif:
-                    repeat_count = 2
-                    current_end = next_start_index + k
-                    
-                    # Extend the run until the motif changes or sequence ends
-                    while current_end + k <= seq_len and sequence[current_end:current_end + k] == motif:
-                        repeat_count += 1
-                        current_end += k
-                    
-                    start_index = i
-                    
-                    # Check if the current run's start_index is after the end index of the last stored run
-                    # This ensures we only store the full, longest contiguous run.
-                    last_end_index = all_repeats[k][motif][-1][0] + k * all_repeats[k][motif][-1][1] - 1 if all_repeats[k][motif] else -1
-                    
-                    if start_index > last_end_index:
-                        all_repeats[k][motif].append((start_index, repeat_count))
-    
-    return all_repeats
+    return tandem_repeats.find_tandem_repeats(sequence, min_len, max_len, skip_covered=True)
 
 def analyze_genome_repeats(sequence):
     """
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Vectorized tandem repeat detection.
+
+Two consecutive copies of a k-mer start at i exactly when
+seq[j] == seq[j + k] for every j in i .. i + k - 1, so all the tandem
+runs of period k are found by comparing the sequence with its k-shifted
+copy once: a position i starts a repeat when the run of equal positions
+starting at i is r >= k long, and the repeat then has 1 + r // k copies.
+This replaces the per-position slice comparisons (and the rescans
+inside every run) with a few NumPy passes per motif length; only the
+positions that do start a repeat are turned into motif strings.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+
+def encode_sequence(sequence):
+    """Sequence as an array of character codes (any characters are kept distinct)."""
+    return np.frombuffer(sequence.encode('utf-32-le'), dtype=np.uint32)
+
+
+def repeat_starts(codes, k):
+    """
+    All the positions where at least two copies of a k-mer follow each
+    other. Returns (starts, copies): sorted start positions and the
+    number of consecutive copies from each start.
+    """
+    if len(codes) < 2 * k:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    equal = np.concatenate(([False], codes[:-k] == codes[k:], [False]))
+    edges = np.flatnonzero(equal[1:] != equal[:-1])
+    run_start, run_end = edges[0::2], edges[1::2]  # runs of equal positions [start, end)
+    long_runs = run_end - run_start >= k
+    run_start, run_end = run_start[long_runs], run_end[long_runs]
+
+    # Positions run_start .. run_end - k of every run start a repeat
+    num_starts = run_end - run_start - k + 1
+    first = np.repeat(run_start - np.cumsum(num_starts) + num_starts, num_starts)
+    starts = np.arange(num_starts.sum()) + first
+    copies = 1 + (np.repeat(run_end, num_starts) - starts) // k
+    return starts, copies
+
+
+def find_tandem_repeats(sequence, min_len=3, max_len=6, skip_covered=False):
+    """
+    Detects tandem repeats of motif lengths min_len..max_len (min 2 copies).
+    Returns {k: {motif: [(start_index, repeat_count)]}}, motifs in order of
+    their first repeat. By default every start position is listed; with
+    skip_covered, a start inside the last stored run of the same motif is
+    skipped, so every run is listed once.
+    """
+    all_repeats = defaultdict(lambda: defaultdict(list))
+    if not sequence:
+        return all_repeats
+
+    codes = encode_sequence(sequence)
+    for k in range(min_len, max_len + 1):
+        starts, copies = repeat_starts(codes, k)
+        for start, count in zip(starts.tolist(), copies.tolist()):
+            locations = all_repeats[k][sequence[start:start + k]]
+            if skip_covered and locations and start < locations[-1][0] + k * locations[-1][1]:
+                continue
+            locations.append((start, count))
+    return all_repeats
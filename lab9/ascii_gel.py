@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Band occupancy of the ASCII gels of lab9.
+
+A gel row at `marker` bp holds the fragments with
+marker - step/2 <= length < marker + step/2. Instead of testing every
+fragment for every row, the fragments of a lane are sorted once and the
+number of fragments of every row is the difference of two binary
+searches (np.searchsorted on the row edges), so a lane with tens of
+thousands of fragments costs O((rows + fragments) log fragments).
+
+The count is shown as the band intensity: co-migrating fragments give a
+brighter band.
+
+With a migration model fitted on a ladder (migration.py), the rows are
+evenly spaced in calibrated migration distance instead of in bp, as on
+a real gel: small fragments spread out and large ones crowd near the
+well. migration_markers() gives the size at the centre of every row,
+and the same two binary searches run on the fragment distances.
+"""
+
+import numpy as np
+
+from migration import check_monotonic, estimate_size, migration_distance
+
+# Band symbol by number of fragments in the row (the last one for more)
+BAND_SYMBOLS = ("         ", "=========", "#########", "@@@@@@@@@")
+
+
+def band_counts(fragments, markers, step, model=None):
+    """
+    Number of fragments in the gel row of every marker. With a migration
+    model the rows are centred on the distance of their marker and are
+    `step` mm high.
+    """
+    fragments = np.asarray(fragments, dtype=float)
+    markers = np.asarray(markers, dtype=float)
+    if model is not None:
+        # Distances grow as the sizes fall: negate them to keep one order
+        fragments, markers = -migration_distance(model, fragments), -migration_distance(model, markers)
+    fragments = np.sort(fragments)
+    upper = np.searchsorted(fragments, markers + step / 2, side='left')
+    lower = np.searchsorted(fragments, markers - step / 2, side='left')
+    return upper - lower
+
+
+def gel_matrix(lanes, markers, step, model=None):
+    """Fragment counts of every (marker row, lane) of a gel, as a 2D array."""
+    if not lanes:
+        return np.zeros((len(markers), 0), dtype=np.int64)
+    return np.stack([band_counts(fragments, markers, step, model) for fragments in lanes], axis=1)
+
+
+def migration_markers(model, largest, smallest, num_rows=40):
+    """
+    Rows evenly spaced in migration distance from the largest to the
+    smallest size. Returns (markers, step): the size (bp) at the centre of
+    every row, largest first, and the row height in mm.
+    """
+    check_monotonic(model, (smallest, largest))
+    top, bottom = migration_distance(model, [largest, smallest])
+    distances = np.linspace(top, bottom, num_rows)
+    return estimate_size(model, distances).tolist(), (bottom - top) / (num_rows - 1)
+
+
+def band_symbol(count):
+    """Symbol of a band with `count` fragments (blank if none)."""
+    return BAND_SYMBOLS[min(count, len(BAND_SYMBOLS) - 1)]
+
+
+def intensity_legend():
+    """One-line legend of the band symbols."""
+    levels = [f"'{symbol[0]}' {count}" for count, symbol in enumerate(BAND_SYMBOLS) if count]
+    return f"Fragments per band: {', '.join(levels)}+"
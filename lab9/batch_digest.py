@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Batch restriction digest of many FASTA files.
+
+Every FASTA file (all the records in it) is one task of a process pool;
+each worker compiles the enzyme panel once. Instead of printing the cut
+positions and fragment lists, the results are written as flat columns
+to one compressed NumPy archive (.npz):
+
+- genome_file, genome_name, genome_length: one row per FASTA record;
+- enzymes: the enzyme names;
+- cut_genome, cut_enzyme, cut_position: one row per cut;
+- fragment_genome, fragment_enzyme, fragment_length: one row per fragment.
+
+Rows are sorted by (genome, enzyme), so the cuts or fragments of one
+genome and enzyme are a contiguous slice; load_digest() reads it back.
+
+Usage: python batch_digest.py <directory or FASTA files...> [--enzymes=library]
+                              [--circular] [--workers=N] [--out=digest.npz]
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from restriction import (DEFAULT_ENZYMES, compile_panel, find_cuts, fragment_lengths, load_enzymes,
+                         read_fasta)
+
+FASTA_EXTENSIONS = ('.fasta', '.fa', '.fna', '.fas')
+
+_worker = {}
+
+
+def fasta_files(paths):
+    """Expands directories into their FASTA files (sorted); files are kept as given."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                if name.lower().endswith(FASTA_EXTENSIONS)))
+        else:
+            files.append(path)
+    return files
+
+
+def _init_worker(enzymes, circular):
+    """Pool initializer: the panel is compiled once per worker."""
+    _worker.update(panel=compile_panel(enzymes), circular=circular)
+
+
+def digest_file(filepath, panel=None, circular=None):
+    """
+    Digests every record of a FASTA file.
+    Returns (names, lengths, cut columns, fragment columns); the columns
+    are (record, enzyme, value) arrays local to the file.
+    """
+    panel = panel or _worker['panel']
+    circular = _worker.get('circular', False) if circular is None else circular
+    headers, sequences = read_fasta(filepath)
+    cut_columns, fragment_columns = ([], [], []), ([], [], [])
+
+    for record, sequence in enumerate(sequences):
+        cuts = find_cuts(sequence, panel, circular)
+        for enzyme, name in enumerate(panel['names']):
+            fragments = fragment_lengths(cuts[name], len(sequence), circular)
+            for columns, values in ((cut_columns, cuts[name]), (fragment_columns, fragments)):
+                columns[0].append(np.full(len(values), record, dtype=np.int32))
+                columns[1].append(np.full(len(values), enzyme, dtype=np.int16))
+                columns[2].append(values.astype(np.int64))
+
+    def stack(columns):
+        if not columns[0]:
+            return (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int16), np.empty(0, dtype=np.int64))
+        return tuple(np.concatenate(column) for column in columns)
+
+    return headers, [len(s) for s in sequences], stack(cut_columns), stack(fragment_columns)
+
+
+def batch_digest(files, enzymes=DEFAULT_ENZYMES, circular=False, workers=None):
+    """
+    Digests all the files on a process pool and returns the columnar
+    table (a dict of arrays, as written by write_digest).
+    """
+    genome_file, genome_name, genome_length = [], [], []
+    cut_columns, fragment_columns = ([], [], []), ([], [], [])
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(enzymes, circular)) as pool:
+        for filepath, (names, lengths, cuts, fragments) in zip(files, pool.imap(digest_file, files)):
+            # Record indices of the file -> global genome indices
+            first = len(genome_name)
+            genome_file.extend([os.path.basename(filepath)] * len(names))
+            genome_name.extend(names)
+            genome_length.extend(lengths)
+            for columns, (record, enzyme, values) in ((cut_columns, cuts), (fragment_columns, fragments)):
+                columns[0].append(record + first)
+                columns[1].append(enzyme)
+                columns[2].append(values)
+
+    def column(parts, dtype):
+        return np.concatenate(parts).astype(dtype) if parts else np.empty(0, dtype=dtype)
+
+    return {
+        'genome_file': np.array(genome_file, dtype=str),
+        'genome_name': np.array(genome_name, dtype=str),
+        'genome_length': np.array(genome_length, dtype=np.int64),
+        'enzymes': np.array([enzyme[0] for enzyme in enzymes], dtype=str),
+        'circular': np.array(circular),
+        'cut_genome': column(cut_columns[0], np.int32),
+        'cut_enzyme': column(cut_columns[1], np.int16),
+        'cut_position': column(cut_columns[2], np.int64),
+        'fragment_genome': column(fragment_columns[0], np.int32),
+        'fragment_enzyme': column(fragment_columns[1], np.int16),
+        'fragment_length': column(fragment_columns[2], np.int64),
+    }
+
+
+def write_digest(table, filepath):
+    """Writes the columnar digest table as a compressed .npz archive."""
+    np.savez_compressed(filepath, **table)
+
+
+def load_digest(filepath):
+    """Reads a digest table written by write_digest (a dict of arrays)."""
+    with np.load(filepath) as archive:
+        return {key: archive[key] for key in archive.files}
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = dict(arg[2:].split("=", 1) if "=" in arg else (arg[2:], "")
+                   for arg in sys.argv[1:] if arg.startswith("--"))
+    if not args:
+        print("Usage: python batch_digest.py <directory or FASTA files...> [--enzymes=library] "
+              "[--circular] [--workers=N] [--out=digest.npz]")
+        return
+
+    enzymes = load_enzymes(options['enzymes']) if 'enzymes' in options else DEFAULT_ENZYMES
+    workers = int(options['workers']) if 'workers' in options else None
+    output = options.get('out', "digest.npz")
+    files = fasta_files(args)
+    if not files:
+        print("Error: no FASTA files found.")
+        return
+
+    start = time.perf_counter()
+    table = batch_digest(files, enzymes, 'circular' in options, workers)
+    write_digest(table, output)
+    print(f"Digested {len(table['genome_name'])} sequences from {len(files)} files with "
+          f"{len(enzymes)} enzymes in {time.perf_counter() - start:.2f} s.")
+    print(f"{len(table['cut_position'])} cuts and {len(table['fragment_length'])} fragments "
+          f"saved to: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Fragment-size index: which genomes give a band of size X with enzyme Y?
+
+The index is built from the digest tables of batch_digest.py and kept
+on disk (.npz). For every enzyme it holds the fragment lengths of all
+the indexed genomes, sorted, with the genome of each fragment:
+
+- length, genome: the entries, grouped by enzyme and sorted by length;
+- offsets: entries of enzyme i are length[offsets[i]:offsets[i + 1]];
+- enzymes, genome_file, genome_name, genome_length: the names.
+
+A size-range query is two binary searches in the slice of the enzyme.
+Adding a digest merges its sorted fragments into every slice
+(np.searchsorted + np.insert) instead of rebuilding the index, and
+genomes already in the index are skipped.
+
+Usage: python fragment_index.py add <digest.npz...> [--index=fragment_index.npz]
+       python fragment_index.py query <enzyme> <size> [tolerance, e.g. 5% or 20]
+                                      [--index=fragment_index.npz]
+"""
+
+import os
+import sys
+
+import numpy as np
+
+from band_compare import parse_resolution
+from batch_digest import load_digest
+
+INDEX_FILE = "fragment_index.npz"
+
+
+def empty_index():
+    """An index without genomes or enzymes."""
+    return {
+        'enzymes': np.empty(0, dtype=str),
+        'genome_file': np.empty(0, dtype=str),
+        'genome_name': np.empty(0, dtype=str),
+        'genome_length': np.empty(0, dtype=np.int64),
+        'length': np.empty(0, dtype=np.int64),
+        'genome': np.empty(0, dtype=np.int32),
+        'offsets': np.zeros(1, dtype=np.int64),
+    }
+
+
+def add_digest(index, table):
+    """
+    Adds the genomes of a digest table (batch_digest.py) to the index and
+    returns the updated index. Genomes already indexed (same file and
+    name) are skipped, so a genome keeps the enzymes of the digest that
+    added it; new enzymes get a new slice.
+    """
+    known = set(zip(index['genome_file'].tolist(), index['genome_name'].tolist()))
+    keys = list(zip(table['genome_file'].tolist(), table['genome_name'].tolist()))
+    is_new = np.array([key not in known for key in keys], dtype=bool)
+    # Table genome -> index genome (-1 if skipped)
+    new_id = np.full(len(keys), -1, dtype=np.int64)
+    new_id[is_new] = len(index['genome_name']) + np.arange(is_new.sum())
+
+    enzymes = index['enzymes'].tolist()
+    enzymes += [name for name in table['enzymes'].tolist() if name not in enzymes]
+    enzyme_of_table = np.array([enzymes.index(name) for name in table['enzymes'].tolist()],
+                               dtype=np.int64)
+
+    # New entries: kept genomes only, in (enzyme, length) order
+    keep = is_new[table['fragment_genome']]
+    add_enzyme = enzyme_of_table[table['fragment_enzyme'][keep]]
+    add_length = table['fragment_length'][keep]
+    add_genome = new_id[table['fragment_genome'][keep]]
+    order = np.lexsort((add_length, add_enzyme))
+    add_enzyme, add_length, add_genome = add_enzyme[order], add_length[order], add_genome[order]
+    add_bounds = np.searchsorted(add_enzyme, np.arange(len(enzymes) + 1))
+
+    # Merge the sorted new fragments into the slice of every enzyme
+    lengths, genomes, offsets = [], [], [0]
+    for enzyme in range(len(enzymes)):
+        if enzyme + 1 < len(index['offsets']):
+            start, end = index['offsets'][enzyme], index['offsets'][enzyme + 1]
+        else:
+            start = end = 0
+        old_length, old_genome = index['length'][start:end], index['genome'][start:end]
+        new_length = add_length[add_bounds[enzyme]:add_bounds[enzyme + 1]]
+        new_genome = add_genome[add_bounds[enzyme]:add_bounds[enzyme + 1]]
+        where = np.searchsorted(old_length, new_length, side='right')
+        lengths.append(np.insert(old_length, where, new_length))
+        genomes.append(np.insert(old_genome, where, new_genome))
+        offsets.append(offsets[-1] + len(lengths[-1]))
+
+    return {
+        'enzymes': np.array(enzymes, dtype=str),
+        'genome_file': np.concatenate([index['genome_file'], table['genome_file'][is_new]]),
+        'genome_name': np.concatenate([index['genome_name'], table['genome_name'][is_new]]),
+        'genome_length': np.concatenate([index['genome_length'], table['genome_length'][is_new]]),
+        'length': np.concatenate(lengths).astype(np.int64) if lengths else index['length'],
+        'genome': np.concatenate(genomes).astype(np.int32) if genomes else index['genome'],
+        'offsets': np.array(offsets, dtype=np.int64),
+    }
+
+
+def query(index, enzyme, low, high):
+    """
+    Fragments of `enzyme` with low <= length <= high.
+    Returns {genome name: sorted fragment lengths in the range}.
+    """
+    enzymes = index['enzymes'].tolist()
+    if enzyme not in enzymes:
+        raise ValueError(f"Enzyme '{enzyme}' is not in the index.")
+    i = enzymes.index(enzyme)
+    lengths = index['length'][index['offsets'][i]:index['offsets'][i + 1]]
+    genomes = index['genome'][index['offsets'][i]:index['offsets'][i + 1]]
+    first = np.searchsorted(lengths, low, side='left')
+    last = np.searchsorted(lengths, high, side='right')
+
+    hits = {}
+    for genome, length in zip(genomes[first:last].tolist(), lengths[first:last].tolist()):
+        hits.setdefault(index['genome_name'][genome], []).append(length)
+    return hits
+
+
+def save_index(index, filepath=INDEX_FILE):
+    """Writes the index as a compressed .npz archive."""
+    np.savez_compressed(filepath, **index)
+
+
+def load_index(filepath=INDEX_FILE):
+    """Reads an index, or returns an empty one if the file does not exist."""
+    if not os.path.exists(filepath):
+        return empty_index()
+    with np.load(filepath) as archive:
+        return {key: archive[key] for key in archive.files}
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--index=")]
+    index_file = next((arg.split("=", 1)[1] for arg in sys.argv[1:] if arg.startswith("--index=")),
+                      INDEX_FILE)
+    if len(args) >= 2 and args[0] == "add":
+        index = load_index(index_file)
+        before = len(index['genome_name'])
+        for digest_file in args[1:]:
+            index = add_digest(index, load_digest(digest_file))
+        save_index(index, index_file)
+        print(f"Added {len(index['genome_name']) - before} genomes; the index holds "
+              f"{len(index['genome_name'])} genomes, {len(index['length'])} fragments: {index_file}")
+    elif len(args) >= 3 and args[0] == "query":
+        enzyme, size = args[1], int(args[2])
+        tolerance_bp, tolerance_percent = parse_resolution(args[3]) if len(args) > 3 else (0, 0.0)
+        tolerance = max(tolerance_bp, size * tolerance_percent / 100)
+        try:
+            hits = query(load_index(index_file), enzyme, size - tolerance, size + tolerance)
+        except ValueError as error:
+            print(f"Error: {error}")
+            return
+        print(f"{len(hits)} genomes give a {enzyme} band of {size} bp (+/- {tolerance:g} bp):")
+        for name, lengths in hits.items():
+            print(f"  {name}: {lengths}")
+    else:
+        print("Usage: " + __doc__.split("Usage: ")[1].strip())
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,10 @@ Created on Thu Nov 27 11:50:33 2025
 
 import sys
 
+from ascii_gel import band_symbol, gel_matrix, intensity_legend, migration_markers
+from migration import fit_ladder
+from restriction import DEFAULT_ENZYMES, compile_panel, find_cuts, fragment_lengths, load_enzymes
+
 def main():
     try:
         sequence = ""
@@ -21,34 +25,23 @@ def main():
     seq_len = len(sequence)
     print(f"DNA Sequence Length: {seq_len} bp\n")
 
-    enzymes = [
-        ("EcoRI", "GAATTC", 1),
-        ("BamHI", "GGATCC", 1),
-        ("HindIII", "AAGCTT", 1),
-        ("TaqI", "TCGA", 1),
-        ("HaeIII", "GGCC", 2)
-    ]
+    # Usage: python lab9_1.py [enzyme_library] [--circular] [--calibrated]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    circular = "--circular" in sys.argv
+    # Rows evenly spaced in migration distance (1 kb ladder fit) instead of bp
+    model = fit_ladder() if "--calibrated" in sys.argv else None
+    # Optional enzyme library file (see enzymes.txt), else the default panel
+    enzymes = load_enzymes(args[0]) if args else DEFAULT_ENZYMES
+    # One pass over the sequence finds the sites of the whole panel
+    all_cuts = find_cuts(sequence, compile_panel(enzymes), circular)
+    if circular:
+        print("Circular genome: the fragments across the origin are joined.\n")
 
     enzyme_results = {}
 
-    for name, site, offset in enzymes:
-        cut_positions = []
-        search_start = 0
-        while True:
-            idx = sequence.find(site, search_start)
-            if idx == -1:
-                break
-            cut_positions.append(idx + offset)
-            search_start = idx + 1
-        
-        fragments = []
-        last_cut = 0
-        sorted_cuts = sorted(cut_positions)
-        
-        for cut in sorted_cuts:
-            fragments.append(cut - last_cut)
-            last_cut = cut
-        fragments.append(seq_len - last_cut)
+    for name, *_ in enzymes:
+        sorted_cuts = all_cuts[name].tolist()
+        fragments = fragment_lengths(all_cuts[name], seq_len, circular).tolist()
         
         enzyme_results[name] = {
             "cuts": sorted_cuts,
@@ -62,25 +55,25 @@ def main():
         print("")
 
     print("--- Simulated Electrophoresis Gel ---")
-    print("Base Pairs (bp) | " + " | ".join(f"{name:^9}" for name, _, _ in enzymes))
+    print("Base Pairs (bp) | " + " | ".join(f"{name:^9}" for name, *_ in enzymes))
     print("-" * (18 + 12 * len(enzymes)))
 
     step = seq_len // 40
     if step < 50: step = 50
 
-    for marker in range(seq_len, 0, -step):
-        line = f"{marker:<15} | "
-        for name, _, _ in enzymes:
-            frags = enzyme_results[name]["fragments"]
-            has_band = False
-            for frag in frags:
-                if marker - (step/2) <= frag < marker + (step/2):
-                    has_band = True
-                    break
-            
-            symbol = "=========" if has_band else "         "
-            line += f"{symbol} | "
+    # Band counts of every row and lane at once, from the sorted fragments
+    if model is None:
+        markers = list(range(seq_len, 0, -step))
+    else:
+        markers, step = migration_markers(model, seq_len, 50)
+    counts = gel_matrix([enzyme_results[name]["fragments"] for name, *_ in enzymes], markers, step, model)
+
+    for marker, row in zip(markers, counts.tolist()):
+        line = f"{marker:<15.0f} | "
+        for count in row:
+            line += f"{band_symbol(count)} | "
         print(line)
+    print(intensity_legend())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
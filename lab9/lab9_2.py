@@ -7,6 +7,13 @@ Created on Thu Nov 27 15:16:53 2025
 
 import sys
 
+import numpy as np
+
+from ascii_gel import band_symbol, gel_matrix, intensity_legend, migration_markers
+from band_compare import differential_bands, parse_resolution
+from migration import fit_ladder
+from restriction import DEFAULT_ENZYMES, compile_panel, find_cuts, fragment_lengths, load_enzymes
+
 def main():
     sequences = {}
     current_header = None
@@ -25,87 +32,75 @@ def main():
         print("Error: sequences.fasta not found.")
         return
 
-    enzymes = [
-        ("EcoRI", "GAATTC", 1),
-        ("BamHI", "GGATCC", 1),
-        ("HindIII", "AAGCTT", 1),
-        ("TaqI", "TCGA", 1),
-        ("HaeIII", "GGCC", 2)
-    ]
-
-    all_strains_data = {}
-    
-    for header, sequence in sequences.items():
-        strain_data = {}
-        seq_len = len(sequence)
-        
-        for name, site, offset in enzymes:
-            cut_positions = []
-            search_start = 0
-            while True:
-                idx = sequence.find(site, search_start)
-                if idx == -1:
-                    break
-                cut_positions.append(idx + offset)
-                search_start = idx + 1
-            
-            fragments = []
-            last_cut = 0
-            sorted_cuts = sorted(cut_positions)
-            for cut in sorted_cuts:
-                fragments.append(cut - last_cut)
-                last_cut = cut
-            fragments.append(seq_len - last_cut)
-            
-            strain_data[name] = sorted(fragments, reverse=True)
-        all_strains_data[header] = strain_data
+    # Usage: python lab9_2.py [enzyme_library] [--resolution=BP or PERCENT%] [--circular]
+    #                         [--calibrated]
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    circular = "--circular" in sys.argv
+    # Rows evenly spaced in migration distance (1 kb ladder fit) instead of bp
+    model = fit_ladder() if "--calibrated" in sys.argv else None
+    resolution = [arg.split("=", 1)[1] for arg in sys.argv[1:] if arg.startswith("--resolution=")]
+    resolution_bp, resolution_percent = parse_resolution(resolution[-1]) if resolution else (0, 0.0)
+    # Optional enzyme library file (see enzymes.txt), else the default panel
+    enzymes = load_enzymes(args[0]) if args else DEFAULT_ENZYMES
+    panel = compile_panel(enzymes)
 
-    common_bands = {name: set() for name, _, _ in enzymes}
+    # Fragment arrays of every strain, per enzyme
+    strain_fragments = {name: [] for name, *_ in enzymes}
     
-    for name, _, _ in enzymes:
-        first_strain = True
-        for header in sequences:
-            current_frags = set(all_strains_data[header][name])
-            if first_strain:
-                common_bands[name] = current_frags
-                first_strain = False
-            else:
-                common_bands[name] = common_bands[name].intersection(current_frags)
+    for sequence in sequences.values():
+        # One pass over the sequence finds the sites of the whole panel
+        all_cuts = find_cuts(sequence, panel, circular)
+        for name, *_ in enzymes:
+            strain_fragments[name].append(fragment_lengths(all_cuts[name], len(sequence), circular))
 
-    merged_bands = {name: [] for name, _, _ in enzymes}
+    # Bands shared by all the strains (within the gel resolution) are
+    # removed; the other fragments of every strain stay on the gel
+    merged_bands = {}
     max_frag_len = 0
+    headers = list(sequences)
+    band_summary = []
 
-    for header in sequences:
-        for name, _, _ in enzymes:
-            for frag in all_strains_data[header][name]:
-                if frag > max_frag_len:
-                    max_frag_len = frag
-                if frag not in common_bands[name]:
-                    merged_bands[name].append(frag)
+    for name, *_ in enzymes:
+        bands = differential_bands(strain_fragments[name], resolution_bp, resolution_percent)
+        merged_bands[name] = bands['length'][~bands['conserved'][bands['band']]]
+        if len(bands['length']):
+            max_frag_len = max(max_frag_len, int(bands['length'][-1]))
+        specific = np.bincount(bands['specific'][bands['specific'] >= 0], minlength=len(headers))
+        band_summary.append((name, int(bands['conserved'].sum()), specific))
 
     print(f"Analyzed {len(sequences)} sequences.")
     print("Generating Differential Electrophoresis Gel (Conserved bands removed)...")
+    if resolution:
+        print(f"Gel resolution: {resolution[-1]}")
+    if circular:
+        print("Circular genomes: the fragments across the origin are joined.")
+    for name, conserved, specific in band_summary:
+        line = f"{name}: {conserved} conserved bands, {specific.sum()} strain-specific bands"
+        if specific.sum() > 0:
+            line += f" (most in {headers[int(specific.argmax())].split()[0]}: {specific.max()})"
+        print(line)
     print("")
 
-    print("BP       | " + " | ".join(f"{name:^9}" for name, _, _ in enzymes))
+    print("BP       | " + " | ".join(f"{name:^9}" for name, *_ in enzymes))
     print("-" * (11 + 12 * len(enzymes)))
 
     step = 50
     if max_frag_len > 2000: step = 100
     if max_frag_len > 5000: step = 200
 
-    for marker in range(max_frag_len + step, 0, -step):
-        line = f"{marker:<8} | "
-        for name, _, _ in enzymes:
-            frags = merged_bands[name]
-            has_band = False
-            for frag in frags:
-                if marker - (step/2) <= frag < marker + (step/2):
-                    has_band = True
-                    break
-            symbol = "=========" if has_band else "         "
-            line += f"{symbol} | "
+    # Band counts of every row and lane at once, from the sorted fragments
+    if model is None:
+        markers = list(range(max_frag_len + step, 0, -step))
+    else:
+        markers, step = migration_markers(model, max_frag_len + step, 50)
+    counts = gel_matrix([merged_bands[name] for name, *_ in enzymes], markers, step, model)
+
+    for marker, row in zip(markers, counts.tolist()):
+        line = f"{marker:<8.0f} | "
+        for count in row:
+            line += f"{band_symbol(count)} | "
         print(line)
+    print(intensity_legend())
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Double and multi-enzyme digests from precomputed cut arrays.
+
+Every strain is digested once with the whole panel (restriction.py); the
+cuts of a combination of enzymes are then the merge of their sorted cut
+arrays, so no combination rescans a genome. Every combination of `size`
+enzymes (all C(n, 2) pairs by default) is scored on a process pool by
+how well its gel separates the strains: two strains are separated if
+their band profiles differ at the gel resolution (band_compare.py).
+
+Usage: python multi_digest.py [enzyme_library] [size] [resolution] [top]
+"""
+
+import itertools
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+
+from band_compare import differential_bands, parse_resolution
+from restriction import (DEFAULT_ENZYMES, compile_panel, find_cuts, fragment_lengths, load_enzymes,
+                         read_fasta)
+
+
+def merge_cuts(cut_arrays):
+    """Sorted union of sorted cut arrays (a stable sort merges the runs)."""
+    if not cut_arrays:
+        return np.empty(0, dtype=np.int64)
+    cuts = np.sort(np.concatenate(cut_arrays), kind='stable')
+    keep = np.ones(len(cuts), dtype=bool)
+    keep[1:] = cuts[1:] != cuts[:-1]
+    return cuts[keep]
+
+
+def digest_strains(sequences, enzymes, circular=False):
+    """
+    Digests every sequence once with the whole panel.
+    Returns (cuts, lengths): cuts[name] is the list of cut arrays of that
+    enzyme (one per strain), lengths the sequence lengths.
+    """
+    panel = compile_panel(enzymes)
+    cuts = {name: [] for name, *_ in enzymes}
+    lengths = []
+    for sequence in sequences:
+        strain_cuts = find_cuts(sequence, panel, circular)
+        for name in cuts:
+            cuts[name].append(strain_cuts[name])
+        lengths.append(len(sequence))
+    return cuts, lengths
+
+
+def combination_fragments(cuts, lengths, combination, circular=False):
+    """Fragment arrays of every strain digested with all the enzymes of the combination."""
+    return [fragment_lengths(merge_cuts([cuts[name][strain] for name in combination]),
+                             lengths[strain], circular)
+            for strain in range(len(lengths))]
+
+
+def separation_score(strain_fragments, resolution_bp=0, resolution_percent=0.0):
+    """
+    Groups the strains whose gels look the same (same bands, with the
+    same number of fragments in each, at the gel resolution).
+    Returns (separated strain pairs, number of distinct gel profiles).
+    """
+    bands = differential_bands(strain_fragments, resolution_bp, resolution_percent)
+    num_strains = len(strain_fragments)
+    # Band list of every strain, in (strain, band) order
+    order = np.lexsort((bands['band'], bands['strain']))
+    strain_bands = bands['band'][order]
+    bounds = np.searchsorted(bands['strain'][order], np.arange(num_strains + 1))
+    profiles = {}
+    for strain in range(num_strains):
+        profile = strain_bands[bounds[strain]:bounds[strain + 1]].tobytes()
+        profiles[profile] = profiles.get(profile, 0) + 1
+    same = sum(count * (count - 1) // 2 for count in profiles.values())
+    return num_strains * (num_strains - 1) // 2 - same, len(profiles)
+
+
+# --- Parallel ranking ---
+
+_shared = {}
+
+
+def _init_worker(cuts, lengths, resolution, circular):
+    """Pool initializer: the cut arrays are sent once per worker."""
+    _shared.update(cuts=cuts, lengths=lengths, resolution=resolution, circular=circular)
+
+
+def _score_combination(combination):
+    """Scores one combination in a worker."""
+    fragments = combination_fragments(_shared['cuts'], _shared['lengths'], combination,
+                                      _shared['circular'])
+    separated, profiles = separation_score(fragments, *_shared['resolution'])
+    num_bands = sum(len(f) for f in fragments)
+    return combination, separated, profiles, num_bands
+
+
+def rank_combinations(cuts, lengths, size=2, resolution=(0, 0.0), circular=False, workers=None):
+    """
+    Scores every combination of `size` enzymes and returns
+    (combination, separated pairs, distinct profiles, total bands) tuples,
+    best first: most separated strain pairs, then fewest bands (the
+    simplest gel that separates them).
+    """
+    combinations = list(itertools.combinations(list(cuts), size))
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(cuts, lengths, resolution, circular)) as pool:
+        chunksize = max(1, len(combinations) // (4 * (workers or multiprocessing.cpu_count())))
+        results = pool.map(_score_combination, combinations, chunksize)
+    results.sort(key=lambda result: (-result[1], result[3]))
+    return results
+
+
+def main():
+    enzymes = load_enzymes(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ENZYMES
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    resolution = parse_resolution(sys.argv[3]) if len(sys.argv) > 3 else (0, 0.0)
+    top = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+
+    try:
+        headers, sequences = read_fasta("sequences.fasta")
+    except FileNotFoundError:
+        print("Error: sequences.fasta not found.")
+        return
+
+    start = time.perf_counter()
+    cuts, lengths = digest_strains(sequences, enzymes)
+    ranking = rank_combinations(cuts, lengths, size, resolution)
+    elapsed = time.perf_counter() - start
+
+    total_pairs = len(headers) * (len(headers) - 1) // 2
+    print(f"Scored {len(ranking)} combinations of {size} enzymes on {len(headers)} strains "
+          f"in {elapsed:.2f} s.\n")
+    print(f"{'Enzymes':<30} | Separated pairs | Profiles | Bands")
+    print("-" * 66)
+    for combination, separated, profiles, num_bands in ranking[:top]:
+        print(f"{' + '.join(combination):<30} | {separated:>7} / {total_pairs:<5} | "
+              f"{profiles:>8} | {num_bands:>5}")
+
+
+if __name__ == "__main__":
+    main()